@@ -1,15 +1,20 @@
 # app.py
 
 import os
+import gzip
 import json
 import time
+import queue
 import logging
+import functools
+import threading
+import importlib.util
+from concurrent.futures import Future
 from datetime import datetime, timezone
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 import numpy as np
-import pandas as pd
-import pickle
-from sklearn.preprocessing import StandardScaler
+import joblib
 
 # Try to import MLflow, fallback to basic model loading if not available
 try:
@@ -20,6 +25,28 @@ except ImportError:
     print("MLflow not available. Using basic model loading.")
     MLFLOW_AVAILABLE = False
 
+# Check for ONNX Runtime, fallback to sklearn inference if not available.
+# skl2onnx takes about a second to import, so it is only imported when a model is converted.
+ONNX_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ('onnxruntime', 'skl2onnx'))
+if not ONNX_AVAILABLE:
+    print("ONNX Runtime not available. Using sklearn inference.")
+
+# Try to import Numba for a compiled random forest kernel, make it optional
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    print("Numba not available. Compiled forest kernel disabled.")
+    NUMBA_AVAILABLE = False
+
+# Try to import orjson for faster response serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    print("orjson not available. Using Flask JSON serialization.")
+    ORJSON_AVAILABLE = False
+
 # Try to import Prometheus, make it optional
 try:
     from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
@@ -28,8 +55,26 @@ except ImportError:
     print("Prometheus client not available. Metrics disabled.")
     PROMETHEUS_AVAILABLE = False
 
+if ORJSON_AVAILABLE:
+    class ORJSONProvider(JSONProvider):
+        """Flask JSON provider backed by orjson, which encodes straight to bytes"""
+        
+        option = orjson.OPT_SERIALIZE_NUMPY
+        
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=self.option).decode('utf-8')
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+        
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype='application/json')
+
 # Initialize Flask app
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -41,10 +86,12 @@ if PROMETHEUS_AVAILABLE:
     REQUEST_LATENCY = Histogram('api_request_duration_seconds', 'API request latency')
     PREDICTION_COUNT = Counter('predictions_total', 'Total predictions made', ['model_version'])
     MODEL_LOAD_TIME = Histogram('model_load_duration_seconds', 'Model loading time')
+    BATCH_SIZE = Histogram('prediction_batch_size', 'Requests coalesced per model call',
+                           buckets=(1, 2, 4, 8, 16, 32, 64, 128))
 else:
     # Dummy metrics when Prometheus is not available
     class DummyCounter:
-        def inc(self): pass
+        def inc(self, amount=1): pass
         def labels(self, **kwargs): return self
     
     class DummyHistogram:
@@ -54,31 +101,215 @@ else:
     REQUEST_LATENCY = DummyHistogram()
     PREDICTION_COUNT = DummyCounter()
     MODEL_LOAD_TIME = DummyHistogram()
+    BATCH_SIZE = DummyHistogram()
 
 # Global variables for model and metadata
 model = None
 model_version = None
 model_info = None
-scaler = None
+onnx_session = None
+forest_arrays = None
+
+# Last loaded model keyed by its source, so reloading an unchanged model skips unpickling
+_MODEL_CACHE = {}
 feature_names = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
 target_names = ['setosa', 'versicolor', 'virginica']
 
-def load_model_from_mlflow():
+# Feature standardization: StandardScaler statistics of the training split used by
+# train_model.py (test_size=0.2, random_state=42, stratified). Inference runs in float32,
+# which is also the dtype sklearn trees and ONNX use internally.
+_SCALER_MEAN = np.array([5.84166667, 3.04833333, 3.77, 1.205], dtype=np.float32)
+_SCALER_INV_SCALE = (1.0 / np.array([0.837415, 0.44665112, 1.761136, 0.75947899])).astype(np.float32)
+
+# Finite inputs are saturated to this magnitude before narrowing to float32, so they neither
+# become inf nor overflow in the scaling; such values lie past every split threshold either way
+_FEATURE_LIMIT = float(np.finfo(np.float32).max / _SCALER_INV_SCALE.max() / 2)
+
+# Per-thread scratch array that request features are copied into
+_thread_buffers = threading.local()
+
+# (second, ISO string) pair backing cached_timestamp()
+_timestamp_cache = (None, None)
+
+# Dynamic batching configuration
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 32))
+BATCH_WAIT_TIMEOUT_S = float(os.environ.get('BATCH_WAIT_TIMEOUT_S', 0.01))
+
+# Prediction cache configuration (features are rounded before lookup)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 4096))
+PREDICTION_CACHE_DECIMALS = int(os.environ.get('PREDICTION_CACHE_DECIMALS', 4))
+
+# Largest number of instances accepted by /predict_batch in one request
+MAX_BATCH_INSTANCES = int(os.environ.get('MAX_BATCH_INSTANCES', 1000))
+
+def exported_onnx_path(model_file):
+    """Return the ONNX export written by train_model.py next to a pickle, if it is up to date"""
+    onnx_file = os.path.splitext(model_file)[0] + '.onnx'
+    if os.path.exists(onnx_file) and os.path.getmtime(onnx_file) >= os.path.getmtime(model_file):
+        return onnx_file
+    return None
+
+def build_onnx_session(sk_model, onnx_file=None):
+    """Create an ONNX Runtime session from an exported file, or by converting the sklearn classifier"""
+    import onnxruntime as ort
+    
+    if onnx_file is not None:
+        with open(onnx_file, 'rb') as f:
+            serialized = f.read()
+    else:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+        
+        onnx_model = convert_sklearn(
+            sk_model,
+            initial_types=[('X', FloatTensorType([None, len(feature_names)]))],
+            options={id(sk_model): {'zipmap': False}}
+        )
+        serialized = onnx_model.SerializeToString()
+    
+    # Single-threaded: gunicorn workers provide the parallelism, and the session may be created
+    # before workers fork, which ONNX Runtime thread pools do not survive
+    session_options = ort.SessionOptions()
+    session_options.intra_op_num_threads = 1
+    session_options.inter_op_num_threads = 1
+    return ort.InferenceSession(
+        serialized,
+        sess_options=session_options,
+        providers=['CPUExecutionProvider']
+    )
+
+if NUMBA_AVAILABLE:
+    # Serial kernel: gunicorn workers provide the parallelism, and the model is warmed up
+    # in the master before workers fork, which Numba's parallel thread pools are not safe across
+    @numba.njit(cache=True)
+    def _forest_proba(X, thresholds, features, left, right, leaf_values):
+        """Average leaf class distributions over all trees for each row of X"""
+        n_trees = thresholds.shape[0]
+        n_classes = leaf_values.shape[2]
+        out = np.zeros((X.shape[0], n_classes))
+        
+        for i in range(X.shape[0]):
+            for t in range(n_trees):
+                node = 0
+                while left[t, node] != -1:
+                    if X[i, features[t, node]] <= thresholds[t, node]:
+                        node = left[t, node]
+                    else:
+                        node = right[t, node]
+                for c in range(n_classes):
+                    out[i, c] += leaf_values[t, node, c]
+        
+        return out / n_trees
+
+def build_forest_arrays(sk_model):
+    """Pack the trees of a fitted RandomForestClassifier into compact padded [tree, node] arrays"""
+    trees = [estimator.tree_ for estimator in sk_model.estimators_]
+    n_trees = len(trees)
+    n_nodes = max(tree.node_count for tree in trees)
+    n_classes = len(sk_model.classes_)
+    
+    # Narrowest index type that addresses every node; halves or quarters the bytes walked per split
+    index_dtype = np.int16 if n_nodes <= np.iinfo(np.int16).max else np.int32
+    
+    thresholds = np.zeros((n_trees, n_nodes), dtype=np.float32)
+    features = np.zeros((n_trees, n_nodes), dtype=index_dtype)
+    left = np.full((n_trees, n_nodes), -1, dtype=index_dtype)
+    right = np.full((n_trees, n_nodes), -1, dtype=index_dtype)
+    leaf_values = np.zeros((n_trees, n_nodes, n_classes), dtype=np.float32)
+    
+    for t, tree in enumerate(trees):
+        count = tree.node_count
+        # Round thresholds down so float32 inputs take the same branch as against the float64 split
+        threshold = tree.threshold.astype(np.float32)
+        rounded_up = threshold > tree.threshold
+        threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+        thresholds[t, :count] = threshold
+        features[t, :count] = tree.feature
+        left[t, :count] = tree.children_left
+        right[t, :count] = tree.children_right
+        # Normalize per node: older sklearn versions store class counts rather than fractions
+        values = tree.value[:, 0, :]
+        leaf_values[t, :count] = values / values.sum(axis=1, keepdims=True)
+    
+    return thresholds, features, left, right, leaf_values
+
+def load_pickle(path):
+    """Load a joblib/pickle model file; workers share it copy-on-write via preload_app and gc.freeze"""
+    return joblib.load(path)
+
+def load_cached_model(key, loader, force=False):
+    """Return the model cached under key, calling loader() only on a miss"""
+    if not force and key in _MODEL_CACHE:
+        logger.info(f"Reusing cached model for {key}")
+        return _MODEL_CACHE[key]
+    
+    loaded_model = loader()
+    # Only the current model is kept, so replaced models can be garbage collected
+    _MODEL_CACHE.clear()
+    _MODEL_CACHE[key] = loaded_model
+    return loaded_model
+
+def build_inference_backends():
+    """Prepare the fastest available inference backend for the current model"""
+    global onnx_session, forest_arrays
+    
+    # Single-sample requests gain nothing from joblib worker dispatch
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+    
+    # Use the compiled forest kernel for random forests
+    forest_arrays = None
+    if NUMBA_AVAILABLE and type(model).__name__ == 'RandomForestClassifier':
+        try:
+            forest_arrays = build_forest_arrays(model)
+            # Warm up so JIT compilation does not land on the first request
+            _forest_proba(np.zeros((1, len(feature_names)), dtype=np.float32), *forest_arrays)
+            logger.info("Model compiled with Numba forest kernel")
+        except Exception as e:
+            forest_arrays = None
+            logger.warning(f"Numba forest kernel unavailable: {e}")
+    
+    # Otherwise compile the model for ONNX Runtime, keeping sklearn as the fallback
+    onnx_session = None
+    if forest_arrays is None and ONNX_AVAILABLE:
+        try:
+            onnx_file = None
+            if model_info["source"] == "local_file":
+                onnx_file = exported_onnx_path(model_info["file"])
+            onnx_session = build_onnx_session(model, onnx_file)
+            logger.info(f"Model loaded into ONNX Runtime from {onnx_file or 'in-memory conversion'}")
+        except Exception as e:
+            logger.warning(f"ONNX conversion failed, using sklearn inference: {e}")
+    
+    # Cached predictions belong to the previous model
+    _cached_infer.cache_clear()
+
+def load_model_from_mlflow(force=False):
     """Load the latest model from MLflow model registry or local file"""
-    global model, model_version, model_info, scaler
+    global model, model_version, model_info
     
     start_time = time.time()
+    previous_model = model
     try:
         if MLFLOW_AVAILABLE:
             # Set MLflow tracking URI
             mlflow.set_tracking_uri("file:./mlruns")
+            client = mlflow.tracking.MlflowClient()
             
             # Try to load from model registry first
             try:
                 model_name = "iris-classifier"
-                model_version = "latest"
+                # Resolve "latest" to a concrete version so it can key the model cache
+                versions = client.search_model_versions(f"name='{model_name}'")
+                if not versions:
+                    raise Exception(f"No registered versions of '{model_name}'")
+                model_version = str(max(int(v.version) for v in versions))
                 model_uri = f"models:/{model_name}/{model_version}"
-                model = mlflow.sklearn.load_model(model_uri)
+                model = load_cached_model(
+                    ("model_registry", model_name, model_version),
+                    lambda: mlflow.sklearn.load_model(model_uri),
+                    force
+                )
                 model_info = {
                     "source": "model_registry",
                     "name": model_name,
@@ -92,20 +323,29 @@ def load_model_from_mlflow():
                 experiment = mlflow.get_experiment_by_name(experiment_name)
                 
                 if experiment:
-                    runs = mlflow.search_runs(experiment_ids=[experiment.experiment_id])
-                    if not runs.empty:
-                        # Get the best run (highest accuracy)
-                        best_run = runs.loc[runs['metrics.accuracy'].idxmax()]
-                        run_id = best_run['run_id']
+                    # Let the tracking store pick the best run (highest accuracy)
+                    runs = client.search_runs(
+                        experiment_ids=[experiment.experiment_id],
+                        order_by=["metrics.accuracy DESC"],
+                        max_results=1
+                    )
+                    if runs:
+                        best_run = runs[0]
+                        run_id = best_run.info.run_id
+                        accuracy = best_run.data.metrics['accuracy']
                         model_uri = f"runs:/{run_id}/model"
-                        model = mlflow.sklearn.load_model(model_uri)
+                        model = load_cached_model(
+                            ("experiment_run", run_id),
+                            lambda: mlflow.sklearn.load_model(model_uri),
+                            force
+                        )
                         model_info = {
                             "source": "experiment_run",
                             "run_id": run_id,
-                            "accuracy": best_run['metrics.accuracy']
+                            "accuracy": accuracy
                         }
                         model_version = run_id[:8]  # Use first 8 chars of run_id as version
-                        logger.info(f"Loaded model from run: {run_id}, accuracy: {best_run['metrics.accuracy']:.4f}")
+                        logger.info(f"Loaded model from run: {run_id}, accuracy: {accuracy:.4f}")
                     else:
                         raise Exception("No trained models found in MLflow")
                 else:
@@ -117,8 +357,11 @@ def load_model_from_mlflow():
             
             for model_file in model_files:
                 if os.path.exists(model_file):
-                    with open(model_file, 'rb') as f:
-                        model = pickle.load(f)
+                    model = load_cached_model(
+                        ("local_file", model_file, os.path.getmtime(model_file)),
+                        lambda: load_pickle(model_file),
+                        force
+                    )
                     model_info = {
                         "source": "local_file",
                         "file": model_file
@@ -131,15 +374,9 @@ def load_model_from_mlflow():
             if not model_loaded:
                 raise Exception("No model files found. Please train a model first.")
         
-        # Initialize scaler (in production, this should also be saved with MLflow)
-        scaler = StandardScaler()
-        # Fit scaler with dummy data based on Iris dataset statistics
-        dummy_data = np.array([
-            [5.1, 3.5, 1.4, 0.2],  # Typical setosa
-            [7.0, 3.2, 4.7, 1.4],  # Typical versicolor
-            [6.3, 3.3, 6.0, 2.5]   # Typical virginica
-        ])
-        scaler.fit(dummy_data)
+        # A reload that resolved to the serving model keeps its backends and cached predictions
+        if model is not previous_model:
+            build_inference_backends()
         
         load_time = time.time() - start_time
         MODEL_LOAD_TIME.observe(load_time)
@@ -153,6 +390,181 @@ def load_model_from_mlflow():
         logger.error(f"Failed to load model: {e}")
         return False
 
+def sklearn_predict_proba(features_scaled):
+    """sklearn fallback; random forests skip joblib dispatch and input re-validation"""
+    if type(model).__name__ != 'RandomForestClassifier':
+        return model.predict_proba(features_scaled)
+    
+    # Same averaging as RandomForestClassifier.predict_proba; predict_batch() guarantees the
+    # float32 C-contiguous input that the trees' check_input=False path requires
+    probabilities = np.zeros((features_scaled.shape[0], len(model.classes_)))
+    for estimator in model.estimators_:
+        probabilities += estimator.predict_proba(features_scaled, check_input=False)
+    probabilities /= len(model.estimators_)
+    return probabilities
+
+def predict_batch(features_list):
+    """Run a single scaling/model pass over a batch of feature vectors"""
+    # float32 C-order once at the boundary: every backend reads rows in float32, and the
+    # scaling below preserves the layout, so no backend needs to copy its input
+    features_array = np.asarray(features_list)
+    if features_array.dtype != np.float32:
+        features_array = np.clip(features_array, -_FEATURE_LIMIT, _FEATURE_LIMIT)
+    features_array = np.asarray(features_array, dtype=np.float32, order='C')
+    features_scaled = (features_array - _SCALER_MEAN) * _SCALER_INV_SCALE
+    
+    if forest_arrays is not None:
+        probabilities = _forest_proba(features_scaled, *forest_arrays)
+    elif onnx_session is not None:
+        probabilities = onnx_session.run(['probabilities'], {'X': features_scaled})[0]
+    else:
+        probabilities = sklearn_predict_proba(features_scaled)
+    
+    # predict() is argmax(predict_proba()), so derive it rather than walking the model twice
+    predictions = probabilities.argmax(axis=1)
+    return predictions, probabilities
+
+class PredictionBatcher:
+    """Coalesce concurrent prediction requests into a single model call"""
+    
+    def __init__(self, max_batch_size=MAX_BATCH_SIZE, wait_timeout=BATCH_WAIT_TIMEOUT_S):
+        self.max_batch_size = max(1, max_batch_size)
+        self.wait_timeout = wait_timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+    
+    def submit(self, features):
+        """Queue one feature vector and block until its prediction is ready"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((features, future))
+        return future.result()
+    
+    def _ensure_worker(self):
+        # Started lazily so that forked server workers each get their own thread
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='prediction-batcher', daemon=True)
+                self._worker.start()
+    
+    def _collect_batch(self):
+        """Wait for one request, then gather more until the batch is full or the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.wait_timeout
+        
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            BATCH_SIZE.observe(len(batch))
+            try:
+                predictions, probabilities = predict_batch([features for features, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            for i, (_, future) in enumerate(batch):
+                future.set_result((predictions[i], probabilities[i]))
+
+batcher = PredictionBatcher()
+
+@functools.lru_cache(maxsize=PREDICTION_CACHE_SIZE)
+def _cached_infer(features):
+    """Predict a single rounded feature tuple, memoized across requests"""
+    prediction, prediction_proba = batcher.submit(features)
+    return int(prediction), tuple(prediction_proba.tolist())
+
+def request_buffer():
+    """Return this thread's reusable (1, n_features) float64 array"""
+    buffer = getattr(_thread_buffers, 'features', None)
+    if buffer is None:
+        buffer = _thread_buffers.features = np.empty((1, len(feature_names)), dtype=np.float64)
+    return buffer
+
+def cached_timestamp():
+    """UTC ISO timestamp, regenerated at most once per second"""
+    global _timestamp_cache
+    now = int(time.time())
+    second, timestamp = _timestamp_cache
+    if second != now:
+        timestamp = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        _timestamp_cache = (now, timestamp)
+    return timestamp
+
+def parse_json_body():
+    """Parse the request body as JSON regardless of Content-Type, or return None"""
+    if ORJSON_AVAILABLE:
+        try:
+            # cache=False: the raw body is not needed again after parsing
+            return orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            return None
+    return request.get_json(force=True, silent=True)
+
+def static_json(payload):
+    """Serialize a constant response body once, at import time"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+def static_response(body, status):
+    """Wrap a pre-serialized JSON body in a response"""
+    return app.response_class(body, status=status, mimetype='application/json')
+
+# Error bodies that never change are serialized once instead of per request
+ERR_MODEL_NOT_LOADED = static_json({
+    "error": "Model not loaded",
+    "message": "Please ensure the model is properly trained and available"
+})
+ERR_MODEL_NOT_LOADED_SHORT = static_json({"error": "Model not loaded"})
+ERR_NO_JSON = static_json({
+    "error": "No JSON data provided or invalid JSON format",
+    "message": "Please provide valid JSON with 'features' field"
+})
+ERR_MISSING_FEATURES = static_json({
+    "error": "Missing 'features' field",
+    "expected_format": {
+        "features": [5.1, 3.5, 1.4, 0.2]
+    }
+})
+ERR_MISSING_INSTANCES = static_json({
+    "error": "Missing 'instances' field",
+    "expected_format": {
+        "instances": [[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]]
+    }
+})
+ERR_METRICS_UNAVAILABLE = static_json({"error": "Prometheus metrics not available"})
+ERR_NOT_FOUND = static_json({
+    "error": "Not found",
+    "message": "The requested endpoint does not exist",
+    "available_endpoints": [
+        "/health",
+        "/predict",
+        "/predict_batch",
+        "/metrics",
+        "/model/info",
+        "/model/reload"
+    ]
+})
+ERR_INTERNAL = static_json({
+    "error": "Internal server error",
+    "message": "An unexpected error occurred"
+})
+
 # Initialize model on startup
 with app.app_context():
     def initialize():
@@ -164,6 +576,48 @@ with app.app_context():
     
     initialize()
 
+def batch_prediction_response(instances):
+    """Validate a list of feature lists and answer it with one model pass"""
+    if not isinstance(instances, list) or not 0 < len(instances) <= MAX_BATCH_INSTANCES:
+        return jsonify({
+            "error": f"Instances must be a list of 1 to {MAX_BATCH_INSTANCES} feature lists"
+        }), 400
+    
+    # Stack into one float64 matrix, narrowed by predict_batch(); ragged or non-numeric input fails here
+    try:
+        instances_array = np.asarray(instances, dtype=np.float64)
+    except (TypeError, ValueError):
+        instances_array = None
+    
+    if instances_array is None or instances_array.shape != (len(instances), len(feature_names)):
+        return jsonify({
+            "error": "Each instance must be a list of 4 numeric values",
+            "feature_names": feature_names
+        }), 400
+    
+    if not np.isfinite(instances_array).all():
+        return jsonify({"error": "All features must be finite numbers"}), 400
+    
+    predictions, probabilities = predict_batch(instances_array)
+    
+    response_data = {
+        "predictions": [
+            {
+                "class_id": class_id,
+                "class_name": target_names[class_id],
+                "confidence": max(proba),
+                "probabilities": dict(zip(target_names, proba))
+            }
+            for class_id, proba in zip(predictions.tolist(), probabilities.tolist())
+        ],
+        "model_info": model_info,
+        "timestamp": cached_timestamp()
+    }
+    
+    PREDICTION_COUNT.labels(model_version=model_version or 'unknown').inc(len(instances))
+    
+    return jsonify(response_data), 200
+
 @app.before_request
 def before_request():
     """Log request start time"""
@@ -195,9 +649,10 @@ def root():
         "available_endpoints": {
             "GET /health": "Health check",
             "POST /predict": "Make predictions (requires JSON: {\"features\": [5.1, 3.5, 1.4, 0.2]})",
+            "POST /predict_batch": "Predict several samples at once (requires JSON: {\"instances\": [[5.1, 3.5, 1.4, 0.2], ...]})",
             "GET /metrics": "Prometheus metrics",
             "GET /model/info": "Model information",
-            "POST /model/reload": "Reload model"
+            "POST /model/reload": "Reload model (?force=true to bypass the model cache)"
         },
         "example_request": {
             "url": "/predict",
@@ -240,31 +695,24 @@ def predict():
     try:
         # Check if model is loaded
         if model is None:
-            return jsonify({
-                "error": "Model not loaded",
-                "message": "Please ensure the model is properly trained and available"
-            }), 503
+            return static_response(ERR_MODEL_NOT_LOADED, 503)
         
         # Get request data
-        data = request.get_json(force=True, silent=True)
+        data = parse_json_body()
         
         if not data:
-            return jsonify({
-                "error": "No JSON data provided or invalid JSON format",
-                "message": "Please provide valid JSON with 'features' field"
-            }), 400
+            return static_response(ERR_NO_JSON, 400)
         
         # Validate input format
-        if 'features' not in data:
-            return jsonify({
-                "error": "Missing 'features' field",
-                "expected_format": {
-                    "features": [5.1, 3.5, 1.4, 0.2]
-                }
-            }), 400
+        if not isinstance(data, dict) or 'features' not in data:
+            return static_response(ERR_MISSING_FEATURES, 400)
         
         features = data['features']
         
+        # A list of feature lists is answered like /predict_batch
+        if isinstance(features, list) and features and isinstance(features[0], list):
+            return batch_prediction_response(features)
+        
         # Validate features
         if not isinstance(features, list) or len(features) != 4:
             return jsonify({
@@ -273,49 +721,47 @@ def predict():
                 "provided": features
             }), 400
         
-        # Convert to numpy array and validate numeric values
+        # Copy into the thread's reusable float64 array, so finiteness is checked before any narrowing;
+        # the copy itself validates numeric values
+        features_array = request_buffer()
         try:
-            features_array = np.array(features, dtype=float).reshape(1, -1)
-        except ValueError:
+            features_array[0] = features
+        except (TypeError, ValueError):
             return jsonify({
                 "error": "All features must be numeric",
                 "provided": features
             }), 400
         
-        # Scale features
-        if scaler is not None:
-            features_scaled = scaler.transform(features_array)
-        else:
-            features_scaled = features_array
+        if not np.isfinite(features_array).all():
+            return jsonify({
+                "error": "All features must be finite numbers",
+                "provided": features
+            }), 400
         
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        prediction_proba = model.predict_proba(features_scaled)[0]
+        # Make prediction (cached, otherwise batched with concurrent requests)
+        features_key = tuple(np.round(features_array[0], PREDICTION_CACHE_DECIMALS).tolist())
+        prediction, prediction_proba = _cached_infer(features_key)
         
         # Prepare response
+        confidence = max(prediction_proba)
         response_data = {
             "prediction": {
-                "class_id": int(prediction),
+                "class_id": prediction,
                 "class_name": target_names[prediction],
-                "confidence": float(max(prediction_proba))
-            },
-            "probabilities": {
-                target_names[i]: float(prob) 
-                for i, prob in enumerate(prediction_proba)
-            },
-            "input_features": {
-                feature_names[i]: float(features[i]) 
-                for i in range(len(features))
+                "confidence": confidence
             },
+            "probabilities": dict(zip(target_names, prediction_proba)),
+            "input_features": dict(zip(feature_names, map(float, features))),
             "model_info": model_info,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": cached_timestamp()
         }
         
         # Update metrics
         PREDICTION_COUNT.labels(model_version=model_version or 'unknown').inc()
         
-        # Log prediction for monitoring
-        logger.info(f"Prediction made: {target_names[prediction]} (confidence: {max(prediction_proba):.3f})")
+        # Log prediction for monitoring (debug only, this runs on every request)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Prediction made: {target_names[prediction]} (confidence: {confidence:.3f})")
         
         return jsonify(response_data), 200
         
@@ -327,33 +773,68 @@ def predict():
             "timestamp": datetime.now(timezone.utc).isoformat()
         }), 500
 
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch_endpoint():
+    """Batch prediction endpoint: one model pass for all submitted instances"""
+    try:
+        if model is None:
+            return static_response(ERR_MODEL_NOT_LOADED, 503)
+        
+        data = parse_json_body()
+        
+        if not data:
+            return static_response(ERR_NO_JSON, 400)
+        
+        if not isinstance(data, dict) or 'instances' not in data:
+            return static_response(ERR_MISSING_INSTANCES, 400)
+        
+        instances = data['instances']
+        
+        return batch_prediction_response(instances)
+        
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        return jsonify({
+            "error": "Internal server error",
+            "message": str(e),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }), 500
+
 @app.route('/metrics', methods=['GET'])
 def metrics():
     """Prometheus metrics endpoint"""
     if PROMETHEUS_AVAILABLE:
-        return generate_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+        body = generate_latest()
+        headers = {'Content-Type': CONTENT_TYPE_LATEST, 'Vary': 'Accept-Encoding'}
+        # The text exposition is large and repetitive; compress it for scrapers that accept gzip
+        if request.accept_encodings['gzip'] > 0:
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        return body, 200, headers
     else:
-        return jsonify({"error": "Prometheus metrics not available"}), 503
+        return static_response(ERR_METRICS_UNAVAILABLE, 503)
 
 @app.route('/model/info', methods=['GET'])
 def model_info_endpoint():
     """Get model information"""
     if model is None:
-        return jsonify({"error": "Model not loaded"}), 503
+        return static_response(ERR_MODEL_NOT_LOADED_SHORT, 503)
     
     return jsonify({
         "model_info": model_info,
         "feature_names": feature_names,
         "target_names": target_names,
         "model_type": type(model).__name__,
+        "prediction_cache": _cached_infer.cache_info()._asdict(),
         "timestamp": datetime.now(timezone.utc).isoformat()
     }), 200
 
 @app.route('/model/reload', methods=['POST'])
 def reload_model():
-    """Reload model from MLflow"""
+    """Reload model from MLflow (?force=true bypasses the model cache)"""
     try:
-        success = load_model_from_mlflow()
+        force = request.args.get('force', 'false').lower() in ('1', 'true', 'yes')
+        success = load_model_from_mlflow(force=force)
         if success:
             return jsonify({
                 "message": "Model reloaded successfully",
@@ -374,29 +855,16 @@ def reload_model():
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return jsonify({
-        "error": "Not found",
-        "message": "The requested endpoint does not exist",
-        "available_endpoints": [
-            "/health",
-            "/predict",
-            "/metrics",
-            "/model/info",
-            "/model/reload"
-        ]
-    }), 404
+    return static_response(ERR_NOT_FOUND, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    return jsonify({
-        "error": "Internal server error",
-        "message": "An unexpected error occurred"
-    }), 500
+    return static_response(ERR_INTERNAL, 500)
 
 if __name__ == '__main__':
-    # Load model on startup
-    load_model_from_mlflow()
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py).
+    # The model is already loaded at import time.
     
     # Run the app
     port = int(os.environ.get('PORT', 5000))
@@ -406,6 +874,7 @@ if __name__ == '__main__':
     logger.info("Available endpoints:")
     logger.info("  GET  /health       - Health check")
     logger.info("  POST /predict      - Make predictions")
+    logger.info("  POST /predict_batch - Make batch predictions")
     logger.info("  GET  /metrics      - Prometheus metrics")
     logger.info("  GET  /model/info   - Model information")
     logger.info("  POST /model/reload - Reload model")
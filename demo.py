@@ -8,8 +8,20 @@ import requests
 import json
 import time
 import random
+import asyncio
 from datetime import datetime
 
+import numpy as np
+from requests.adapters import HTTPAdapter
+
+# Try to import aiohttp for concurrent load testing, fallback to serial requests
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    print("aiohttp not available. Performance test will send requests serially.")
+    AIOHTTP_AVAILABLE = False
+
 # Configuration
 API_BASE_URL = "http://localhost:5000"  # Change this to your deployed endpoint
 SAMPLE_PREDICTIONS = [
@@ -21,6 +33,11 @@ SAMPLE_PREDICTIONS = [
     {"features": [6.9, 3.1, 5.4, 2.1], "expected": "virginica"},
 ]
 
+# Shared session so requests reuse pooled keep-alive connections
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=32))
+SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
 def print_header(title):
     """Print a formatted header"""
     print("\n" + "="*60)
@@ -44,7 +61,7 @@ def test_health_endpoint():
     print_header("Testing Health Endpoint")
     
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=10)
+        response = SESSION.get(f"{API_BASE_URL}/health", timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -67,7 +84,7 @@ def test_model_info():
     print_header("Testing Model Info Endpoint")
     
     try:
-        response = requests.get(f"{API_BASE_URL}/model/info", timeout=10)
+        response = SESSION.get(f"{API_BASE_URL}/model/info", timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -85,48 +102,53 @@ def test_model_info():
         return False
 
 def test_predictions():
-    """Test prediction endpoint with sample data"""
+    """Test batch prediction endpoint with sample data"""
     print_header("Testing Prediction Endpoint")
     
-    correct_predictions = 0
     total_predictions = len(SAMPLE_PREDICTIONS)
     
-    for i, sample in enumerate(SAMPLE_PREDICTIONS, 1):
+    # Send every sample in one request and match results back by position
+    try:
+        response = SESSION.post(
+            f"{API_BASE_URL}/predict_batch",
+            json={"instances": [sample["features"] for sample in SAMPLE_PREDICTIONS]},
+            timeout=10
+        )
+    except requests.exceptions.RequestException as e:
+        print_error(f"Prediction failed: {e}")
+        return False
+    
+    if response.status_code != 200:
+        print_error(f"Prediction failed with status: {response.status_code}")
+        print(f"   Response: {response.text}")
+        return False
+    
+    predictions = response.json()["predictions"]
+    
+    for i, (sample, prediction) in enumerate(zip(SAMPLE_PREDICTIONS, predictions), 1):
         print(f"\n🔍 Test Case {i}/{total_predictions}")
         print(f"   Input: {sample['features']}")
         print(f"   Expected: {sample['expected']}")
         
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/predict",
-                json={"features": sample["features"]},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                predicted_class = data["prediction"]["class_name"]
-                confidence = data["prediction"]["confidence"]
-                
-                print(f"   Predicted: {predicted_class} (confidence: {confidence:.3f})")
-                
-                if predicted_class == sample["expected"]:
-                    print_success("Correct prediction!")
-                    correct_predictions += 1
-                else:
-                    print_error("Incorrect prediction!")
-                
-                # Show probabilities
-                probs = data["probabilities"]
-                print(f"   Probabilities: {json.dumps(probs, indent=6)}")
-                
-            else:
-                print_error(f"Prediction failed with status: {response.status_code}")
-                print(f"   Response: {response.text}")
-                
-        except requests.exceptions.RequestException as e:
-            print_error(f"Prediction failed: {e}")
+        predicted_class = prediction["class_name"]
+        confidence = prediction["confidence"]
+        
+        print(f"   Predicted: {predicted_class} (confidence: {confidence:.3f})")
+        
+        if predicted_class == sample["expected"]:
+            print_success("Correct prediction!")
+        else:
+            print_error("Incorrect prediction!")
+        
+        # Show probabilities
+        probs = prediction["probabilities"]
+        print(f"   Probabilities: {json.dumps(probs, indent=6)}")
     
+    # Tally once the per-case report is printed
+    correct_predictions = sum(
+        1 for sample, prediction in zip(SAMPLE_PREDICTIONS, predictions)
+        if prediction["class_name"] == sample["expected"]
+    )
     accuracy = correct_predictions / total_predictions
     print(f"\n📊 Accuracy: {correct_predictions}/{total_predictions} ({accuracy:.1%})")
     
@@ -149,7 +171,7 @@ def test_error_handling():
         print(f"\n🧪 Testing: {case['name']}")
         
         try:
-            response = requests.post(
+            response = SESSION.post(
                 f"{API_BASE_URL}/predict",
                 json=case["data"],
                 timeout=10
@@ -168,43 +190,74 @@ def test_error_handling():
     
     return success_count == len(error_cases)
 
-def performance_test():
-    """Run a basic performance test"""
-    print_header("Performance Testing")
-    
-    print_info("Running 50 prediction requests...")
-    
-    start_time = time.time()
-    successful_requests = 0
-    total_requests = 50
-    
+async def _timed_prediction(session, features):
+    """Send one prediction request, returning (succeeded, duration in seconds)"""
+    start = time.perf_counter()
+    try:
+        async with session.post(f"{API_BASE_URL}/predict", json={"features": features}) as response:
+            await response.read()
+            succeeded = response.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        succeeded = False  # Count as failed request
+    return succeeded, time.perf_counter() - start
+
+async def _run_concurrent_predictions(total_requests):
+    """Issue all prediction requests concurrently"""
+    timeout = aiohttp.ClientTimeout(total=5)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(*[
+            _timed_prediction(session, random.choice(SAMPLE_PREDICTIONS)["features"])
+            for _ in range(total_requests)
+        ])
+
+def _run_serial_predictions(total_requests):
+    """Issue prediction requests one after another"""
+    results = []
     for i in range(total_requests):
         # Use random sample
         sample = random.choice(SAMPLE_PREDICTIONS)
+        start = time.perf_counter()
         
         try:
-            response = requests.post(
+            response = SESSION.post(
                 f"{API_BASE_URL}/predict",
                 json={"features": sample["features"]},
                 timeout=5
             )
-            
-            if response.status_code == 200:
-                successful_requests += 1
-            
-            if (i + 1) % 10 == 0:
-                print(f"   Completed {i + 1}/{total_requests} requests...")
-                
+            succeeded = response.status_code == 200
         except requests.exceptions.RequestException:
-            pass  # Count as failed request
+            succeeded = False  # Count as failed request
+        
+        results.append((succeeded, time.perf_counter() - start))
+        
+        if (i + 1) % 10 == 0:
+            print(f"   Completed {i + 1}/{total_requests} requests...")
+    
+    return results
+
+def performance_test():
+    """Run a basic performance test"""
+    print_header("Performance Testing")
+    
+    total_requests = 50
+    mode = "concurrent" if AIOHTTP_AVAILABLE else "serial"
+    print_info(f"Running {total_requests} {mode} prediction requests...")
+    
+    start_time = time.perf_counter()
+    if AIOHTTP_AVAILABLE:
+        results = asyncio.run(_run_concurrent_predictions(total_requests))
+    else:
+        results = _run_serial_predictions(total_requests)
+    total_time = time.perf_counter() - start_time
     
-    end_time = time.time()
-    total_time = end_time - start_time
+    successful_requests = sum(1 for succeeded, _ in results if succeeded)
+    durations_ms = np.array([duration for _, duration in results]) * 1000
     
     print(f"\n📈 Performance Results:")
     print(f"   Total time: {total_time:.2f} seconds")
     print(f"   Successful requests: {successful_requests}/{total_requests}")
-    print(f"   Average response time: {(total_time/total_requests)*1000:.1f} ms")
+    print(f"   Latency p50: {np.percentile(durations_ms, 50):.1f} ms")
+    print(f"   Latency p95: {np.percentile(durations_ms, 95):.1f} ms")
     print(f"   Requests per second: {total_requests/total_time:.1f}")
     
     return successful_requests >= (total_requests * 0.95)  # 95% success rate
@@ -214,7 +267,7 @@ def test_metrics_endpoint():
     print_header("Testing Metrics Endpoint")
     
     try:
-        response = requests.get(f"{API_BASE_URL}/metrics", timeout=10)
+        response = SESSION.get(f"{API_BASE_URL}/metrics", timeout=10)
         
         if response.status_code == 200:
             print_success("Metrics endpoint accessible!")
@@ -0,0 +1,31 @@
+# gunicorn.conf.py
+# Production server settings for the ML Inference API (gunicorn -c gunicorn.conf.py app:app)
+
+import gc
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# One process per core for CPU-bound inference; threads overlap request I/O within a worker.
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+
+# Requests waiting on the prediction batcher each hold a thread, so a worker can only
+# batch as many requests as it has threads. Keep enough in flight to fill batches.
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+
+# Import app.py (and load the model) once in the master; forked workers share those pages
+# copy-on-write instead of each holding a private copy of the model.
+preload_app = True
+
+timeout = 30
+keepalive = 5
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    """Freeze preloaded objects before workers fork so garbage collection does not copy their pages"""
+    gc.freeze()
@@ -6,47 +6,43 @@ Test suite for ML Inference API
 import pytest
 import json
 import numpy as np
-import tempfile
 import os
 from unittest.mock import patch, MagicMock
 import sys
 import pickle
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.datasets import load_iris
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import app
 
-@pytest.fixture
-def client():
-    """Create test client"""
-    # Create a temporary model file for testing
+@pytest.fixture(scope='session')
+def trained_model():
+    """Fit the test model once for the whole session"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.datasets import load_iris
+    
     iris = load_iris()
-    model = RandomForestClassifier(n_estimators=10, random_state=42)
+    model = RandomForestClassifier(n_estimators=10, random_state=42, n_jobs=1)
     model.fit(iris.data, iris.target)
-    
-    with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.pkl') as f:
-        pickle.dump(model, f)
-        model_file = f.name
-    
+    return model
+
+@pytest.fixture
+def client(trained_model):
+    """Create test client"""
     # Mock the model loading
     with patch('app.load_model_from_mlflow') as mock_load:
-        app.model = model
+        app.model = trained_model
         app.model_info = {"source": "test", "file": "test_model.pkl"}
         app.model_version = "test"
+        app.onnx_session = None
+        app.forest_arrays = None
         mock_load.return_value = True
+        app._cached_infer.cache_clear()
         
         app.app.config['TESTING'] = True
         with app.app.test_client() as client:
             yield client
-    
-    # Cleanup
-    try:
-        os.unlink(model_file)
-    except:
-        pass
 
 class TestHealthEndpoint:
     """Test health check endpoint"""
@@ -106,6 +102,22 @@ class TestPredictionEndpoint:
         assert all(isinstance(v, float) for v in probs.values())
         assert abs(sum(probs.values()) - 1.0) < 1e-6  # Should sum to 1
 
+    def test_prediction_response_serialization(self, client):
+        """Test prediction response is JSON with plain numeric values"""
+        data = {"features": ["5.1", 3.5, 1.4, 0.2]}
+        
+        response = client.post('/predict',
+                             data=json.dumps(data),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        
+        result = json.loads(response.data)
+        assert isinstance(result['prediction']['class_id'], int)
+        assert result['input_features']['sepal length (cm)'] == 5.1
+        assert list(result['probabilities']) == app.target_names
+
     def test_prediction_missing_features(self, client):
         """Test prediction with missing features field"""
         data = {"wrong_field": [5.1, 3.5, 1.4, 0.2]}
@@ -143,6 +155,31 @@ class TestPredictionEndpoint:
         data = response.get_json()
         assert 'error' in data
 
+    def test_prediction_non_finite_features(self, client):
+        """Test prediction with NaN or infinite features"""
+        for bad_value in ["nan", "inf", "-inf"]:
+            data = {"features": [5.1, 3.5, bad_value, 0.2]}
+            
+            response = client.post('/predict',
+                                 data=json.dumps(data),
+                                 content_type='application/json')
+            
+            assert response.status_code == 400
+            assert 'finite' in response.get_json()['error']
+
+    def test_prediction_beyond_float32_range(self, client):
+        """Test finite features too large for float32 are accepted, not reported as non-finite"""
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            response = client.post('/predict', json={"features": [1e39, 1, 1, 1]})
+            assert response.status_code == 200
+            assert response.get_json()['input_features']['sepal length (cm)'] == 1e39
+            
+            response = client.post('/predict_batch', json={"instances": [[1e39, 1, 1, 1], [-1e39, 1, 1, 1]]})
+            assert response.status_code == 200
+            assert len(response.get_json()['predictions']) == 2
+
     def test_prediction_no_json(self, client):
         """Test prediction without JSON data"""
         response = client.post('/predict')
@@ -151,6 +188,21 @@ class TestPredictionEndpoint:
         assert 'error' in data
         assert 'JSON' in data['error']
 
+    def test_prediction_invalid_json(self, client):
+        """Test prediction with a malformed or non-object JSON body"""
+        response = client.post('/predict', data='{"features": [5.1,', content_type='application/json')
+        assert response.status_code == 400
+        assert 'JSON' in response.get_json()['error']
+        
+        response = client.post('/predict', data='"features"', content_type='application/json')
+        assert response.status_code == 400
+        assert 'features' in response.get_json()['error']
+
+    def test_prediction_without_content_type(self, client):
+        """Test JSON body is parsed even without a JSON Content-Type"""
+        response = client.post('/predict', data=json.dumps({"features": [5.1, 3.5, 1.4, 0.2]}))
+        assert response.status_code == 200
+
     def test_prediction_no_model(self, client):
         """Test prediction when model is not loaded"""
         with patch('app.model', None):
@@ -164,6 +216,89 @@ class TestPredictionEndpoint:
             data = response.get_json()
             assert 'error' in data
 
+    def test_prediction_cache_hit(self, client):
+        """Test repeated predictions are served from the cache"""
+        data = {"features": [5.1, 3.5, 1.4, 0.2]}
+        
+        first = client.post('/predict', data=json.dumps(data), content_type='application/json')
+        hits_before = app._cached_infer.cache_info().hits
+        second = client.post('/predict', data=json.dumps(data), content_type='application/json')
+        
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert app._cached_infer.cache_info().hits == hits_before + 1
+        assert first.get_json()['probabilities'] == second.get_json()['probabilities']
+        
+        cache_stats = client.get('/model/info').get_json()['prediction_cache']
+        assert cache_stats['hits'] == hits_before + 1
+        assert cache_stats['maxsize'] == app.PREDICTION_CACHE_SIZE
+
+    def test_prediction_timestamp(self, client):
+        """Test prediction timestamp is a cached UTC ISO string"""
+        from datetime import datetime
+        
+        data = {"features": [5.1, 3.5, 1.4, 0.2]}
+        response = client.post('/predict', data=json.dumps(data), content_type='application/json')
+        
+        timestamp = response.get_json()['timestamp']
+        assert datetime.fromisoformat(timestamp).utcoffset().total_seconds() == 0
+
+class TestBatchPredictionEndpoint:
+    """Test batch prediction endpoint"""
+    
+    def test_batch_prediction_success(self, client):
+        """Test batch prediction matches single predictions"""
+        instances = [[5.1, 3.5, 1.4, 0.2], [7.0, 3.2, 4.7, 1.4], [6.3, 3.3, 6.0, 2.5]]
+        
+        response = client.post('/predict_batch',
+                             data=json.dumps({"instances": instances}),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        result = response.get_json()
+        assert len(result['predictions']) == 3
+        
+        for features, batch_pred in zip(instances, result['predictions']):
+            single = client.post('/predict',
+                               data=json.dumps({"features": features}),
+                               content_type='application/json').get_json()
+            assert batch_pred['class_name'] == single['prediction']['class_name']
+            assert abs(sum(batch_pred['probabilities'].values()) - 1.0) < 1e-6
+
+    def test_batch_prediction_invalid_input(self, client):
+        """Test batch prediction rejects malformed instances"""
+        bad_payloads = [
+            {"features": [5.1, 3.5, 1.4, 0.2]},
+            {"instances": []},
+            {"instances": [5.1, 3.5, 1.4, 0.2]},
+            {"instances": [[5.1, 3.5, 1.4]]},
+            {"instances": [[5.1, 3.5, 1.4, 0.2], [1, 2, 3]]},
+            {"instances": [["a", "b", "c", "d"]]},
+            {"instances": [[5.1, 3.5, "nan", 0.2]]},
+        ]
+        
+        for payload in bad_payloads:
+            response = client.post('/predict_batch',
+                                 data=json.dumps(payload),
+                                 content_type='application/json')
+            assert response.status_code == 400, payload
+            assert 'error' in response.get_json()
+
+class TestJSONProvider:
+    """Test orjson-backed JSON provider"""
+    
+    def test_jsonify_numpy_values(self, client):
+        """Test responses serialize numpy values without manual float() casts"""
+        if not app.ORJSON_AVAILABLE:
+            pytest.skip("orjson not available")
+        
+        assert isinstance(app.app.json, app.ORJSONProvider)
+        with app.app.app_context():
+            response = app.jsonify({"value": np.float32(0.5), "values": np.arange(3)})
+        
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.data) == {"value": 0.5, "values": [0, 1, 2]}
+
 class TestModelInfoEndpoint:
     """Test model info endpoint"""
     
@@ -186,6 +321,66 @@ class TestModelInfoEndpoint:
             response = client.get('/model/info')
             assert response.status_code == 503
 
+@pytest.fixture
+def restore_model_state():
+    """Restore the module-level model state after a test reloads the model"""
+    saved = (app.model, app.model_info, app.model_version, app.onnx_session,
+             app.forest_arrays, dict(app._MODEL_CACHE))
+    app._MODEL_CACHE.clear()
+    yield
+    (app.model, app.model_info, app.model_version, app.onnx_session,
+     app.forest_arrays, cache) = saved
+    app._MODEL_CACHE.clear()
+    app._MODEL_CACHE.update(cache)
+
+class TestModelLoading:
+    """Test model loading"""
+    
+    def test_load_best_run_from_mlflow(self, restore_model_state, trained_model):
+        """Test the best run is selected by the tracking store, not via a DataFrame"""
+        model = trained_model
+        
+        best_run = MagicMock()
+        best_run.info.run_id = "abcdef1234567890"
+        best_run.data.metrics = {"accuracy": 0.97}
+        
+        mock_mlflow = MagicMock()
+        mock_client = mock_mlflow.tracking.MlflowClient.return_value
+        mock_client.search_model_versions.return_value = []
+        mock_client.search_runs.return_value = [best_run]
+        mock_mlflow.sklearn.load_model.return_value = model
+        
+        with patch('app.MLFLOW_AVAILABLE', True), patch('app.mlflow', mock_mlflow, create=True):
+            assert app.load_model_from_mlflow() is True
+        
+        search_kwargs = mock_client.search_runs.call_args.kwargs
+        assert search_kwargs['order_by'] == ["metrics.accuracy DESC"]
+        assert search_kwargs['max_results'] == 1
+        mock_mlflow.search_runs.assert_not_called()
+        assert app.model is model
+        assert app.model_info == {"source": "experiment_run", "run_id": "abcdef1234567890", "accuracy": 0.97}
+        assert app.model_version == "abcdef12"
+
+    def test_reload_reuses_cached_model(self, restore_model_state):
+        """Test reloading an unchanged model file skips unpickling and backend rebuilds unless forced"""
+        with patch('app.MLFLOW_AVAILABLE', False), \
+             patch('app.load_pickle', wraps=app.load_pickle) as mock_load_pickle, \
+             patch('app.build_inference_backends', wraps=app.build_inference_backends) as mock_build:
+            assert app.load_model_from_mlflow() is True
+            first_model = app.model
+            app._cached_infer((5.1, 3.5, 1.4, 0.2))
+            assert app.load_model_from_mlflow() is True
+            assert app.model is first_model
+            assert mock_load_pickle.call_count == 1
+            assert mock_build.call_count == 1
+            assert app._cached_infer.cache_info().currsize == 1
+            
+            assert app.load_model_from_mlflow(force=True) is True
+            assert mock_load_pickle.call_count == 2
+            assert mock_build.call_count == 2
+            assert app._cached_infer.cache_info().currsize == 0
+            assert len(app._MODEL_CACHE) == 1
+
 class TestMetricsEndpoint:
     """Test metrics endpoint"""
     
@@ -195,6 +390,25 @@ class TestMetricsEndpoint:
         # Should work whether Prometheus is available or not
         assert response.status_code in [200, 503]
 
+    def test_metrics_gzip(self, client):
+        """Test metrics are gzip-compressed only for clients that accept it"""
+        import gzip
+        exposition = b'# HELP x test\n' + b'x 1\n' * 100
+        with patch('app.PROMETHEUS_AVAILABLE', True), \
+             patch('app.generate_latest', return_value=exposition, create=True), \
+             patch('app.CONTENT_TYPE_LATEST', 'text/plain', create=True):
+            response = client.get('/metrics', headers={'Accept-Encoding': 'gzip, deflate'})
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert gzip.decompress(response.data) == exposition
+            
+            response = client.get('/metrics')
+            assert 'Content-Encoding' not in response.headers
+            assert response.data == exposition
+            
+            response = client.get('/metrics', headers={'Accept-Encoding': 'gzip;q=0, identity'})
+            assert 'Content-Encoding' not in response.headers
+            assert response.data == exposition
+
 class TestErrorHandling:
     """Test error handling"""
     
@@ -227,19 +441,162 @@ class TestIntegration:
             [6.3, 3.3, 6.0, 2.5]   # Virginica
         ]
         
-        for features in test_cases:
-            data = {"features": features}
-            response = client.post('/predict', 
-                                 data=json.dumps(data),
-                                 content_type='application/json')
-            
-            assert response.status_code == 200
-            result = response.get_json()
-            
-            # Verify prediction is valid
-            assert result['prediction']['class_id'] in [0, 1, 2]
-            assert result['prediction']['class_name'] in ['setosa', 'versicolor', 'virginica']
-            assert 0 <= result['prediction']['confidence'] <= 1
+        data = {"features": test_cases}
+        response = client.post('/predict',
+                             data=json.dumps(data),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        result = response.get_json()
+        assert len(result['predictions']) == 3
+
+        # Verify predictions are valid
+        for prediction in result['predictions']:
+            assert prediction['class_id'] in [0, 1, 2]
+            assert prediction['class_name'] in ['setosa', 'versicolor', 'virginica']
+            assert 0 <= prediction['confidence'] <= 1
+
+class TestScaling:
+    """Test inline feature scaling"""
+    
+    def test_scaling_constants_match_training(self):
+        """Test scaling constants reproduce the training StandardScaler"""
+        from sklearn.datasets import load_iris
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        
+        iris = load_iris()
+        X_train, _, _, _ = train_test_split(
+            iris.data, iris.target, test_size=0.2, random_state=42, stratify=iris.target
+        )
+        scaler = StandardScaler().fit(X_train)
+        
+        features = np.array([[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]])
+        expected = scaler.transform(features)
+        actual = (features - app._SCALER_MEAN) * app._SCALER_INV_SCALE
+        assert np.allclose(actual, expected, atol=1e-5)
+
+class TestSklearnFallback:
+    """Test sklearn inference fallback"""
+    
+    def test_sklearn_fallback_matches_predict_proba(self, client):
+        """Test the per-tree sklearn fallback matches RandomForestClassifier.predict_proba"""
+        features = np.array([[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]], dtype=np.float32)
+        assert np.allclose(app.sklearn_predict_proba(features), app.model.predict_proba(features))
+
+    def test_predict_batch_accepts_fortran_order(self, client):
+        """Test non-contiguous input is converted once at the predict_batch boundary"""
+        samples = np.asfortranarray([[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]])
+        predictions, probabilities = app.predict_batch(samples)
+        assert np.allclose(probabilities, app.model.predict_proba(
+            (samples.astype(np.float32) - app._SCALER_MEAN) * app._SCALER_INV_SCALE))
+
+class TestOnnxInference:
+    """Test ONNX Runtime inference path"""
+    
+    def test_onnx_matches_sklearn(self, client):
+        """Test ONNX probabilities match the sklearn model"""
+        if not app.ONNX_AVAILABLE:
+            pytest.skip("ONNX Runtime not available")
+        
+        samples = [[5.1, 3.5, 1.4, 0.2], [7.0, 3.2, 4.7, 1.4], [6.3, 3.3, 6.0, 2.5]]
+        expected_pred, expected_proba = app.predict_batch(samples)
+        
+        with patch('app.onnx_session', app.build_onnx_session(app.model)):
+            predictions, probabilities = app.predict_batch(samples)
+        
+        assert list(predictions) == list(expected_pred)
+        assert np.allclose(probabilities, expected_proba, atol=1e-5)
+
+class TestForestKernel:
+    """Test compiled random forest kernel"""
+    
+    def test_forest_kernel_matches_sklearn(self, client):
+        """Test Numba forest probabilities match the sklearn model"""
+        if not app.NUMBA_AVAILABLE:
+            pytest.skip("Numba not available")
+        
+        samples = [[5.1, 3.5, 1.4, 0.2], [7.0, 3.2, 4.7, 1.4], [6.3, 3.3, 6.0, 2.5]]
+        expected_pred, expected_proba = app.predict_batch(samples)
+        
+        with patch('app.forest_arrays', app.build_forest_arrays(app.model)):
+            predictions, probabilities = app.predict_batch(samples)
+        
+        assert list(predictions) == list(expected_pred)
+        assert np.allclose(probabilities, expected_proba)
+
+    def test_forest_arrays_are_compact(self, client):
+        """Test packed trees use float32 thresholds and narrow node indices"""
+        thresholds, features, left, right, leaf_values = app.build_forest_arrays(app.model)
+
+        assert thresholds.dtype == np.float32
+        assert leaf_values.dtype == np.float32
+        assert features.dtype == left.dtype == right.dtype == np.int16
+
+    def test_exported_onnx_file(self, client, tmp_path):
+        """Test a model exported by train_model.py is served from the ONNX file"""
+        if not app.ONNX_AVAILABLE:
+            pytest.skip("ONNX Runtime not available")
+        import train_model
+        
+        model_file = tmp_path / "model.pkl"
+        with open(model_file, 'wb') as f:
+            pickle.dump(app.model, f)
+        assert app.exported_onnx_path(str(model_file)) is None
+        
+        assert train_model.export_onnx(app.model, str(tmp_path / "model.onnx")) is True
+        onnx_file = app.exported_onnx_path(str(model_file))
+        assert onnx_file == str(tmp_path / "model.onnx")
+        
+        samples = [[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]]
+        expected_pred, expected_proba = app.predict_batch(samples)
+        with patch('app.onnx_session', app.build_onnx_session(None, onnx_file)):
+            predictions, probabilities = app.predict_batch(samples)
+        
+        assert list(predictions) == list(expected_pred)
+        assert np.allclose(probabilities, expected_proba, atol=1e-5)
+
+class TestBatching:
+    """Test dynamic request batching"""
+    
+    def test_predict_batch_matches_single(self, client):
+        """Test batched predictions match one-at-a-time predictions"""
+        samples = [
+            [5.1, 3.5, 1.4, 0.2],
+            [7.0, 3.2, 4.7, 1.4],
+            [6.3, 3.3, 6.0, 2.5]
+        ]
+        
+        predictions, probabilities = app.predict_batch(samples)
+        assert len(predictions) == 3
+        assert probabilities.shape == (3, 3)
+        
+        for i, sample in enumerate(samples):
+            single_pred, single_proba = app.predict_batch([sample])
+            assert predictions[i] == single_pred[0]
+            assert np.allclose(probabilities[i], single_proba[0])
+
+    def test_concurrent_requests(self, client):
+        """Test concurrent requests are all answered by the batcher"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        batcher = app.PredictionBatcher(max_batch_size=8, wait_timeout=0.05)
+        samples = [[5.1, 3.5, 1.4, 0.2], [6.3, 3.3, 6.0, 2.5]] * 8
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(batcher.submit, samples))
+        
+        assert len(results) == len(samples)
+        for prediction, proba in results:
+            assert prediction in [0, 1, 2]
+            assert abs(sum(proba) - 1.0) < 1e-6
+
+    def test_batch_error_propagates(self, client):
+        """Test model errors are raised in the calling request"""
+        batcher = app.PredictionBatcher(max_batch_size=4, wait_timeout=0.0)
+        with patch('app.model', None):
+            with pytest.raises(AttributeError):
+                batcher.submit([5.1, 3.5, 1.4, 0.2])
 
 def test_model_training():
     """Test model training script"""
@@ -262,5 +619,16 @@ def test_model_training():
     assert len(y_pred) == len(y_test)
     assert y_pred_proba.shape == (len(y_test), 3)
 
+def test_failed_mlflow_setup_disables_logging():
+    """Test a failed MLflow setup leaves later MLflow calls skipped"""
+    import train_model
+    if not train_model.MLFLOW_AVAILABLE:
+        pytest.skip("MLflow not installed")
+    
+    with patch('mlflow.set_tracking_uri', side_effect=RuntimeError("tracking store unavailable")):
+        assert train_model.setup_mlflow() is None
+    assert train_model.mlflow is None
+    assert train_model._safe_mlflow(lambda: pytest.fail("MLflow call was not skipped"), "log") is None
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test suite for the web dashboard's caching and test-run guard
+"""
+
+import pytest
+import os
+from unittest.mock import patch, MagicMock
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_interface
+
+@pytest.fixture
+def session():
+    """Reset dashboard state and answer API health checks from a mocked session"""
+    web_interface.api_status.clear()
+    web_interface.api_status.update({"healthy": False, "last_check": None})
+    web_interface.test_results = None
+    web_interface._results_version = 0
+    web_interface._dashboard_cache = (None, None)
+    web_interface._health_checked_at = None
+    web_interface._health_refreshing = False
+    web_interface._tests_running.clear()
+    
+    mock_session = MagicMock()
+    mock_session.get.return_value.status_code = 200
+    mock_session.get.return_value.json.return_value = {
+        "status": "healthy", "model_loaded": True, "version": "1.0.0"
+    }
+    with patch.object(web_interface, 'SESSION', mock_session):
+        yield mock_session
+
+@pytest.fixture
+def clock():
+    """Control the monotonic clock seen by the health cache"""
+    mock_time = MagicMock(wraps=web_interface.time)
+    mock_time.monotonic.return_value = 100.0
+    with patch.object(web_interface, 'time', mock_time):
+        yield mock_time
+
+class TestHealthCache:
+    """Test the API health TTL and stale-while-revalidate cache"""
+    
+    def test_health_reused_within_ttl(self, session, clock):
+        """Test a health check within the TTL reuses the last result"""
+        assert web_interface.check_api_health() is True
+        clock.monotonic.return_value += web_interface.HEALTH_TTL_S / 2
+        assert web_interface.check_api_health() is True
+        assert session.get.call_count == 1
+    
+    def test_stale_health_refreshed_in_background(self, session, clock):
+        """Test a stale result is served while a single background refresh runs"""
+        web_interface.check_api_health()
+        clock.monotonic.return_value += web_interface.HEALTH_TTL_S + web_interface.HEALTH_STALE_S / 2
+        
+        with patch('web_interface.threading.Thread') as mock_thread:
+            session.get.side_effect = ConnectionError("API down")
+            assert web_interface.check_api_health() is True
+            assert web_interface.check_api_health() is True
+            assert mock_thread.call_count == 1
+            assert session.get.call_count == 1
+            
+            # The refresh records the new result for the next check
+            mock_thread.call_args.kwargs['target']()
+        assert session.get.call_count == 2
+        assert web_interface.api_status["healthy"] is False
+        assert web_interface._health_refreshing is False
+    
+    def test_expired_health_refreshed_inline(self, session, clock):
+        """Test a result past the stale window is refreshed before answering"""
+        web_interface.check_api_health()
+        clock.monotonic.return_value += web_interface.HEALTH_TTL_S + web_interface.HEALTH_STALE_S + 1
+        
+        session.get.side_effect = ConnectionError("API down")
+        with patch('web_interface.threading.Thread') as mock_thread:
+            assert web_interface.check_api_health() is False
+        mock_thread.assert_not_called()
+        assert session.get.call_count == 2
+
+class TestDashboardCache:
+    """Test the rendered dashboard cache"""
+    
+    def test_render_reused_until_results_change(self, session, clock):
+        """Test the page is re-rendered only after health or test results change"""
+        client = web_interface.web_app.test_client()
+        with patch('web_interface.render_template', wraps=web_interface.render_template) as mock_render:
+            first = client.get('/')
+            second = client.get('/')
+            assert first.status_code == second.status_code == 200
+            assert mock_render.call_count == 1
+            
+            web_interface.test_results = web_interface.TestSuite()
+            web_interface._record_result("health", web_interface.SubTest("passed"))
+            client.get('/')
+            assert mock_render.call_count == 2
+            
+            clock.monotonic.return_value += web_interface.HEALTH_TTL_S + web_interface.HEALTH_STALE_S + 1
+            client.get('/')
+            assert mock_render.call_count == 3
+    
+    def test_footer_time_not_cached(self, session, clock):
+        """Test the footer shows the time of each request, not of the cached render"""
+        client = web_interface.web_app.test_client()
+        with patch('web_interface.datetime') as mock_datetime:
+            mock_datetime.now.return_value.strftime.return_value = "2024-01-01 00:00:00"
+            assert b"2024-01-01 00:00:00" in client.get('/').data
+            mock_datetime.now.return_value.strftime.return_value = "2024-01-01 00:00:05"
+            html = client.get('/').data
+        assert b"2024-01-01 00:00:05" in html
+        assert web_interface._RENDERED_AT_MARKER.encode() not in html
+
+class TestRunTestsGuard:
+    """Test only one background test run is started at a time"""
+    
+    def test_second_run_does_not_start_thread(self, session):
+        """Test /run_tests while a run is in progress starts no second thread"""
+        client = web_interface.web_app.test_client()
+        with patch('web_interface.threading.Thread') as mock_thread, \
+             patch('web_interface.run_comprehensive_tests') as mock_run:
+            assert client.get('/run_tests').status_code == 302
+            assert client.get('/run_tests').status_code == 302
+            assert mock_thread.call_count == 1
+            
+            # Once the run finishes the next request starts a new one
+            mock_thread.call_args.kwargs['target']()
+            mock_run.assert_called_once()
+            client.get('/run_tests')
+            assert mock_thread.call_count == 2
@@ -5,31 +5,47 @@ Trains a Random Forest classifier on the Iris dataset
 """
 
 import os
-import pandas as pd
+import contextlib
+import importlib.util
 import numpy as np
 from sklearn.datasets import load_iris
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.metrics import accuracy_score
 from sklearn.preprocessing import StandardScaler
+import joblib
 import pickle
 import json
+import tempfile
 
-# Try to import MLflow, fallback to basic logging if not available
-try:
-    import mlflow
-    import mlflow.sklearn
-    MLFLOW_AVAILABLE = True
-except ImportError:
+# Check for MLflow, fallback to basic logging if not available.
+# The import itself is deferred to setup_mlflow(), it is slow and only needed for tracked runs.
+MLFLOW_AVAILABLE = importlib.util.find_spec('mlflow') is not None
+if not MLFLOW_AVAILABLE:
     print("MLflow not available. Using basic model persistence.")
-    MLFLOW_AVAILABLE = False
+mlflow = None
+
+# Check for skl2onnx for ONNX export, skip the export if not available (imported on first export)
+ONNX_AVAILABLE = importlib.util.find_spec('skl2onnx') is not None
+if not ONNX_AVAILABLE:
+    print("skl2onnx not available. Skipping ONNX export.")
+
+# Converting to ONNX is slow and the service can convert in-process, so exporting the best model is opt-in
+EXPORT_ONNX = os.environ.get('EXPORT_ONNX', 'False').lower() == 'true'
+
+# Iris feature names, in column order (matches load_iris().feature_names)
+FEATURE_NAMES = ['sepal length (cm)', 'sepal width (cm)', 'petal length (cm)', 'petal width (cm)']
 
 def setup_mlflow():
     """Setup MLflow tracking"""
+    global mlflow
     if not MLFLOW_AVAILABLE:
         return None
         
     try:
+        import mlflow
+        import mlflow.sklearn
+        
         # Set MLflow tracking URI using relative path
         # This works better in CI/CD environments
         mlflow.set_tracking_uri("./mlruns")
@@ -49,6 +65,8 @@ def setup_mlflow():
         return experiment_id
         
     except Exception as e:
+        # Unbind the half-initialised module so _safe_mlflow() skips every later call
+        mlflow = None
         print(f"Warning: MLflow setup failed: {e}")
         print("Continuing without MLflow logging...")
         return None
@@ -56,19 +74,18 @@ def setup_mlflow():
 
 def load_and_prepare_data():
     """Load and prepare the Iris dataset"""
-    # Load Iris dataset
+    # Load Iris dataset as plain ndarrays; sklearn needs no DataFrame wrapper
     iris = load_iris()
-    X = pd.DataFrame(iris.data, columns=iris.feature_names)
-    y = pd.Series(iris.target, name='target')
+    X = iris.data
+    y = iris.target
     
-    # Map target names for better interpretability
-    target_names = {0: 'setosa', 1: 'versicolor', 2: 'virginica'}
-    y_named = y.map(target_names)
+    # Map target ids to names for better interpretability
+    y_named = iris.target_names[y]
     
     print("Dataset Info:")
     print(f"Features shape: {X.shape}")
-    print(f"Target classes: {list(target_names.values())}")
-    print(f"Feature names: {list(X.columns)}")
+    print(f"Target classes: {iris.target_names.tolist()}")
+    print(f"Feature names: {FEATURE_NAMES}")
     
     return X, y, y_named, iris.target_names
 
@@ -94,66 +111,98 @@ def train_model(X_train, X_test, y_train, y_test, hyperparams):
     
     return model, y_pred, y_pred_proba, accuracy
 
-def log_model_artifacts(model, X_test, y_test, y_pred, accuracy, feature_names, target_names):
-    """Log model and artifacts to MLflow"""
+def export_onnx(model, path):
+    """Export a fitted classifier to ONNX, with probabilities as a dense array"""
+    if not ONNX_AVAILABLE:
+        return False
     
-    if MLFLOW_AVAILABLE:
-        try:
-            # Log model
-            mlflow.sklearn.log_model(
-                sk_model=model,
-                artifact_path="model",
-                registered_model_name="iris-classifier",
-                input_example=X_test.iloc[:5],
-                signature=mlflow.models.infer_signature(X_test, y_pred)
-            )
-        except Exception as e:
-            print(f"Warning: Failed to log model to MLflow: {e}")
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import FloatTensorType
+        
+        onnx_model = convert_sklearn(
+            model,
+            initial_types=[('X', FloatTensorType([None, model.n_features_in_]))],
+            options={id(model): {'zipmap': False}}
+        )
+        with open(path, 'wb') as f:
+            f.write(onnx_model.SerializeToString())
+        return True
+    except Exception as e:
+        print(f"Warning: Failed to export model to ONNX: {e}")
+        return False
+
+def save_model(model, path):
+    """Persist a model for serving; the service reads it back with joblib.load"""
+    joblib.dump(model, path, compress=0, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _safe_mlflow(action, description):
+    """Run an MLflow call if MLflow was set up, downgrading failures to a warning"""
+    if mlflow is None:
+        return None
+    try:
+        return action()
+    except Exception as e:
+        print(f"Warning: Failed to {description} to MLflow: {e}")
+        return None
+
+def log_model_artifacts(model, X_test, y_pred, accuracy, feature_names):
+    """Log model to MLflow and save it locally"""
+    
+    def log_model():
+        # Named columns only matter for the MLflow signature, so pandas is only needed here
+        import pandas as pd
+        X_example = pd.DataFrame(X_test[:5], columns=feature_names)
+        return mlflow.sklearn.log_model(
+            sk_model=model,
+            artifact_path="model",
+            registered_model_name="iris-classifier",
+            input_example=X_example,
+            signature=mlflow.models.infer_signature(X_example, y_pred[:5])
+        )
+    
+    # Log model
+    _safe_mlflow(log_model, "log model")
     
     # Always save model locally
-    with open('model.pkl', 'wb') as f:
-        pickle.dump(model, f)
+    save_model(model, 'model.pkl')
     
-    # Log feature importance
-    feature_importance = pd.DataFrame({
-        'feature': feature_names,
-        'importance': model.feature_importances_
-    }).sort_values('importance', ascending=False)
+    print(f"Model logged with accuracy: {accuracy:.4f}")
+
+def compute_artifacts(model, y_test, y_pred, feature_names, target_names):
+    """Compute evaluation reports for a trained model, in memory"""
+    from sklearn.metrics import classification_report, confusion_matrix
     
-    feature_importance.to_csv('feature_importance.csv', index=False)
-    if MLFLOW_AVAILABLE:
-        try:
-            mlflow.log_artifact('feature_importance.csv')
-        except Exception as e:
-            print(f"Warning: Failed to log feature importance to MLflow: {e}")
+    order = np.argsort(-model.feature_importances_)
+    feature_importance = np.column_stack([
+        np.asarray(feature_names, dtype=object)[order],
+        model.feature_importances_[order].astype(object)
+    ])
     
-    # Log classification report
-    from sklearn.metrics import classification_report
     report = classification_report(y_test, y_pred, target_names=target_names, output_dict=True)
     
-    # Save and log classification report
-    with open('classification_report.json', 'w') as f:
-        json.dump(report, f, indent=2)
-    if MLFLOW_AVAILABLE:
-        try:
-            mlflow.log_artifact('classification_report.json')
-        except Exception as e:
-            print(f"Warning: Failed to log classification report to MLflow: {e}")
-    
-    # Log confusion matrix
-    from sklearn.metrics import confusion_matrix
     cm = confusion_matrix(y_test, y_pred)
-    cm_df = pd.DataFrame(cm, index=target_names, columns=target_names)
-    cm_df.to_csv('confusion_matrix.csv')
-    if MLFLOW_AVAILABLE:
-        try:
-            mlflow.log_artifact('confusion_matrix.csv')
-        except Exception as e:
-            print(f"Warning: Failed to log confusion matrix to MLflow: {e}")
     
-    print(f"Model logged with accuracy: {accuracy:.4f}")
-    print("Feature Importance:")
-    print(feature_importance)
+    return {
+        "feature_importance": feature_importance,
+        "classification_report": report,
+        "confusion_matrix": cm,
+        "target_names": list(target_names)
+    }
+
+def persist_artifacts(artifacts):
+    """Log evaluation reports to the active MLflow run in a single upload"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        np.savetxt(os.path.join(tmpdir, 'feature_importance.csv'), artifacts["feature_importance"],
+                   fmt='%s,%.6f', header='feature,importance', comments='')
+        with open(os.path.join(tmpdir, 'classification_report.json'), 'w') as f:
+            json.dump(artifacts["classification_report"], f, indent=2)
+        target_names = artifacts["target_names"]
+        np.savetxt(os.path.join(tmpdir, 'confusion_matrix.csv'),
+                   np.column_stack([np.asarray(target_names, dtype=object), artifacts["confusion_matrix"].astype(object)]),
+                   fmt='%s' + ',%d' * len(target_names), header=',' + ','.join(target_names), comments='')
+        
+        _safe_mlflow(lambda: mlflow.log_artifacts(tmpdir, artifact_path='reports'), "log evaluation reports")
 
 def main():
     """Main training pipeline"""
@@ -172,16 +221,8 @@ def main():
     
     # Scale features
     scaler = StandardScaler()
-    X_train_scaled = pd.DataFrame(
-        scaler.fit_transform(X_train), 
-        columns=X.columns,
-        index=X_train.index
-    )
-    X_test_scaled = pd.DataFrame(
-        scaler.transform(X_test), 
-        columns=X.columns,
-        index=X_test.index
-    )
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
     
     # Define hyperparameters to test
     hyperparams_list = [
@@ -192,67 +233,83 @@ def main():
     
     best_accuracy = 0
     best_run_id = None
+    best_model = None
+    best_artifacts = None
     
-    # Train models with different hyperparameters
-    for i, hyperparams in enumerate(hyperparams_list):
-        # Check if MLflow is available and setup was successful
-        mlflow_enabled = MLFLOW_AVAILABLE and experiment_id is not None
-        
+    # Train serially; the forests fit in well under a second, less than worker start-up would cost
+    print(f"\nTraining {len(hyperparams_list)} models...")
+    results = [
+        train_model(X_train_scaled, X_test_scaled, y_train, y_test, hyperparams)
+        for hyperparams in hyperparams_list
+    ]
+    
+    # Check if MLflow is available and setup was successful
+    mlflow_enabled = MLFLOW_AVAILABLE and experiment_id is not None
+    
+    # Group the sweep under one parent run that carries the settings shared by every candidate
+    sweep_run = mlflow.start_run(run_name="iris-rf-sweep") if mlflow_enabled else contextlib.nullcontext()
+    with sweep_run:
         if mlflow_enabled:
-            with mlflow.start_run(run_name=f"iris-rf-run-{i+1}") as run:
-                print(f"\nTraining model {i+1}/3 with hyperparams: {hyperparams}")
-                
-                # Log hyperparameters
-                mlflow.log_params(hyperparams)
-                mlflow.log_param("test_size", 0.2)
-                mlflow.log_param("scaling", "StandardScaler")
-                
-                # Train model
-                model, y_pred, y_pred_proba, accuracy = train_model(
-                    X_train_scaled, X_test_scaled, y_train, y_test, hyperparams
-                )
-                
-                # Log metrics
-                mlflow.log_metric("accuracy", accuracy)
-                mlflow.log_metric("train_size", len(X_train))
-                mlflow.log_metric("test_size", len(X_test))
+            mlflow.log_param("test_size", 0.2)
+            mlflow.log_param("scaling", "StandardScaler")
+            mlflow.log_metric("train_size", len(X_train))
+            mlflow.log_metric("test_size", len(X_test))
+        
+        # Log results serially to avoid tracking-store contention
+        for i, (hyperparams, (model, y_pred, y_pred_proba, accuracy)) in enumerate(zip(hyperparams_list, results)):
+            if mlflow_enabled:
+                with mlflow.start_run(run_name=f"iris-rf-run-{i+1}", nested=True) as run:
+                    print(f"\nLogging model {i+1}/{len(hyperparams_list)} with hyperparams: {hyperparams}")
+                    
+                    # Log hyperparameters and metrics that vary per candidate
+                    mlflow.log_params(hyperparams)
+                    mlflow.log_metric("accuracy", accuracy)
+                    
+                    # Log model
+                    log_model_artifacts(model, X_test_scaled, y_pred, accuracy, FEATURE_NAMES)
+                    
+                    # Track best model; its reports are logged once the sweep is done
+                    if accuracy > best_accuracy:
+                        best_accuracy = accuracy
+                        best_run_id = run.info.run_id
+                        best_model = model
+                        best_artifacts = compute_artifacts(model, y_test, y_pred, FEATURE_NAMES, target_names)
+                    
+                    print(f"Run {i+1} completed with accuracy: {accuracy:.4f}")
+            else:
+                print(f"\nLogging model {i+1}/{len(hyperparams_list)} with hyperparams: {hyperparams}")
                 
-                # Log model and artifacts
-                log_model_artifacts(model, X_test_scaled, y_test, y_pred, accuracy, X.columns, target_names)
+                # Save model
+                log_model_artifacts(model, X_test_scaled, y_pred, accuracy, FEATURE_NAMES)
                 
                 # Track best model
                 if accuracy > best_accuracy:
                     best_accuracy = accuracy
-                    best_run_id = run.info.run_id
+                    best_run_id = f"run-{i+1}"
+                    best_model = model
+                    best_artifacts = compute_artifacts(model, y_test, y_pred, FEATURE_NAMES, target_names)
+                    # Save best model
+                    save_model(model, 'best_model.pkl')
                 
                 print(f"Run {i+1} completed with accuracy: {accuracy:.4f}")
-        else:
-            print(f"\nTraining model {i+1}/3 with hyperparams: {hyperparams}")
-            
-            # Train model
-            model, y_pred, y_pred_proba, accuracy = train_model(
-                X_train_scaled, X_test_scaled, y_train, y_test, hyperparams
-            )
-            
-            # Log model and artifacts
-            log_model_artifacts(model, X_test_scaled, y_test, y_pred, accuracy, X.columns, target_names)
+        
+        print(f"\nTraining completed!")
+        print(f"Best model accuracy: {best_accuracy:.4f}")
+        print(f"Best run ID: {best_run_id}")
+        
+        # Only the best run's evaluation reports are worth persisting
+        if best_artifacts is not None:
+            print("Feature Importance:")
+            for feature, importance in best_artifacts["feature_importance"]:
+                print(f"  {feature}: {importance:.4f}")
             
-            # Track best model
-            if accuracy > best_accuracy:
-                best_accuracy = accuracy
-                best_run_id = f"run-{i+1}"
-                # Save best model
-                with open('best_model.pkl', 'wb') as f:
-                    pickle.dump(model, f)
+            onnx_exported = EXPORT_ONNX and export_onnx(best_model, 'best_model.onnx')
             
-            print(f"Run {i+1} completed with accuracy: {accuracy:.4f}")
-    
-    print(f"\nTraining completed!")
-    print(f"Best model accuracy: {best_accuracy:.4f}")
-    print(f"Best run ID: {best_run_id}")
-    
-    # Check if MLflow was successfully enabled
-    mlflow_enabled = MLFLOW_AVAILABLE and experiment_id is not None
+            if mlflow_enabled:
+                with mlflow.start_run(run_id=best_run_id, nested=True):
+                    persist_artifacts(best_artifacts)
+                    if onnx_exported:
+                        _safe_mlflow(lambda: mlflow.log_artifact('best_model.onnx'), "log ONNX model")
     
     if mlflow_enabled:
         print(f"MLflow UI: mlflow ui")
@@ -264,12 +321,6 @@ def main():
             print(f"Note: MLflow not available")
         else:
             print(f"Note: MLflow logging disabled due to permission issues")
-    
-    # Clean up temporary files
-    import os
-    for file in ['feature_importance.csv', 'classification_report.json', 'confusion_matrix.csv']:
-        if os.path.exists(file):
-            os.remove(file)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,28 +4,81 @@ Web Interface for ML Inference API
 Provides a browser-based dashboard for testing and monitoring the ML service
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for
+from flask.json.provider import JSONProvider
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
+import statistics
 import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 import os
 
+# Try to import aiohttp to run the dashboard tests concurrently, fallback to threaded requests
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    print("aiohttp not available. Dashboard tests will use threaded requests.")
+    AIOHTTP_AVAILABLE = False
+
+# Try to import waitress for a production WSGI server, fallback to the Flask development server
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    print("waitress not available. Using the Flask development server.")
+    WAITRESS_AVAILABLE = False
+
+# Try to import orjson for faster JSON responses, fallback to Flask's default encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    print("orjson not available. Using standard JSON serialization.")
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    class ORJSONProvider(JSONProvider):
+        """Flask JSON provider backed by orjson, which encodes straight to bytes"""
+        
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode('utf-8')
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+        
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
 # Create Flask app for web interface
 web_app = Flask(__name__, template_folder='templates', static_folder='static')
+if ORJSON_AVAILABLE:
+    web_app.json = ORJSONProvider(web_app)
 
 # Add custom Jinja2 filters
 from datetime import datetime
 
-def strftime_filter(timestamp, format='%Y-%m-%d %H:%M:%S'):
-    """Custom strftime filter for Jinja2 templates"""
+def strftime_filter(timestamp, format=None):
+    """Custom strftime filter for Jinja2 templates; ISO strings pass through unless a format is given"""
     if isinstance(timestamp, str):
-        return timestamp
-    return timestamp.strftime(format)
+        if format is None:
+            return timestamp
+        timestamp = datetime.fromisoformat(timestamp)
+    return timestamp.strftime(format or '%Y-%m-%d %H:%M:%S')
 
 web_app.jinja_env.filters['strftime'] = strftime_filter
 
+def _now_iso():
+    """Current local time as an ISO 8601 string, ready for JSON and templates as-is"""
+    return datetime.now().isoformat(timespec='seconds')
+
 # Configuration
 API_BASE_URL = "http://localhost:5000"
 SAMPLE_PREDICTIONS = [
@@ -37,19 +90,126 @@ SAMPLE_PREDICTIONS = [
     {"features": [6.9, 3.1, 5.4, 2.1], "expected": "virginica", "description": "Large Virginica"},
 ]
 
-# Global variables to store test results
-test_results = {}
+ERROR_CASES = [
+    {"name": "Missing features", "data": {"wrong_field": [1, 2, 3, 4]}},
+    {"name": "Wrong feature count", "data": {"features": [1, 2, 3]}},
+    {"name": "Non-numeric features", "data": {"features": ["a", "b", "c", "d"]}},
+    {"name": "Empty features", "data": {"features": []}},
+]
+PERFORMANCE_REQUESTS = 20  # Reduced for web interface
+
+# Fail fast when the API is unreachable; read timeouts stay per call
+CONNECT_TIMEOUT_S = 1.0
+
+# Requests in flight at once while running the dashboard test suite without aiohttp
+TEST_CONCURRENCY = 10
+
+# Shared session so dashboard calls reuse pooled keep-alive connections to the API
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=Retry(total=3, backoff_factor=0.1))
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+def _encode_json(obj):
+    """Encode a request body as JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+# The test payloads never change, so their request bodies are encoded once at import
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+_SAMPLE_BODIES = [_encode_json({"features": sample["features"]}) for sample in SAMPLE_PREDICTIONS]
+_BATCH_BODY = _encode_json({"instances": [sample["features"] for sample in SAMPLE_PREDICTIONS]})
+_ERROR_BODIES = [_encode_json(case["data"]) for case in ERROR_CASES]
+
+@dataclass
+class SubTest:
+    """Outcome of one section of the dashboard test suite"""
+    status: str
+    details: dict = field(default_factory=dict)
+
+def _running():
+    """Placeholder result for a section that has not finished yet"""
+    return SubTest("running")
+
+@dataclass
+class TestSuite:
+    """Results of one dashboard test run, one SubTest per section"""
+    timestamp: str = field(default_factory=_now_iso)
+    health: SubTest = field(default_factory=_running)
+    model_info: SubTest = field(default_factory=_running)
+    predictions: SubTest = field(default_factory=_running)
+    error_handling: SubTest = field(default_factory=_running)
+    performance: SubTest = field(default_factory=_running)
+    metrics: SubTest = field(default_factory=_running)
+    
+    def to_dict(self):
+        """Plain-dict form for JSON responses"""
+        result = {"timestamp": self.timestamp}
+        for section in SECTIONS:
+            sub_test = getattr(self, section)
+            result[section] = {"status": sub_test.status, "details": sub_test.details}
+        return result
+
+SECTIONS = ("health", "model_info", "predictions", "error_handling", "performance", "metrics")
+
+# Global variables to store test results; None until the first run
+test_results = None
 api_status = {"healthy": False, "last_check": None}
 
+# Bumped on every change to test_results; with the health check time it keys the dashboard render
+_results_version = 0
+_dashboard_cache = (None, None)
+# Placeholder for the page's render time, filled in per request so the cached page keeps a live clock
+_RENDERED_AT_MARKER = '__RENDERED_AT__'
+
+# Only one background test run at a time; repeated clicks while it runs are ignored
+_tests_lock = threading.Lock()
+_tests_running = threading.Event()
+
+# Health results are reused for HEALTH_TTL_S; for a further HEALTH_STALE_S the cached
+# result is still served while a background thread refreshes it
+HEALTH_TTL_S = float(os.environ.get('HEALTH_TTL_S', 2.0))
+HEALTH_STALE_S = float(os.environ.get('HEALTH_STALE_S', 10.0))
+_health_lock = threading.Lock()
+_health_checked_at = None
+_health_refreshing = False
+
 def check_api_health():
+    """Check if the API is healthy, reusing a recent result"""
+    global _health_refreshing
+    
+    with _health_lock:
+        age = None if _health_checked_at is None else time.monotonic() - _health_checked_at
+        if age is not None and age < HEALTH_TTL_S:
+            return api_status["healthy"]
+        if age is not None and age < HEALTH_TTL_S + HEALTH_STALE_S:
+            if not _health_refreshing:
+                _health_refreshing = True
+                threading.Thread(target=_refresh_api_health, daemon=True).start()
+            return api_status["healthy"]
+    
+    return _refresh_api_health()
+
+def _refresh_api_health():
+    """Query the API health endpoint and record the result"""
+    global _health_checked_at, _health_refreshing
+    try:
+        return _fetch_api_health()
+    finally:
+        with _health_lock:
+            _health_checked_at = time.monotonic()
+            _health_refreshing = False
+
+def _fetch_api_health():
     """Check if the API is healthy"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+        response = SESSION.get(f"{API_BASE_URL}/health", timeout=(CONNECT_TIMEOUT_S, 5))
         if response.status_code == 200:
             data = response.json()
             api_status.update({
                 "healthy": True,
-                "last_check": datetime.now(),
+                "last_check": _now_iso(),
                 "status": data.get('status'),
                 "model_loaded": data.get('model_loaded'),
                 "version": data.get('version')
@@ -58,234 +218,369 @@ def check_api_health():
     except Exception as e:
         api_status.update({
             "healthy": False,
-            "last_check": datetime.now(),
+            "last_check": _now_iso(),
             "error": str(e)
         })
     return False
 
-def run_comprehensive_tests():
-    """Run comprehensive tests and store results"""
-    global test_results
+def _request(method, path, timeout=10, body=None):
+    """Send one request to the API with an optional pre-encoded JSON body; return (status, decoded JSON body or None)"""
+    response = SESSION.request(method, f"{API_BASE_URL}{path}", timeout=(CONNECT_TIMEOUT_S, timeout), data=body,
+                               headers=_JSON_HEADERS if body is not None else None)
+    try:
+        return response.status_code, response.json()
+    except ValueError:
+        return response.status_code, None
+
+class _MetricsSummary:
+    """Count metric samples and keep the first lines of an exposition, fed one line at a time"""
     
-    test_results = {
-        "timestamp": datetime.now(),
-        "health": {"status": "running", "details": {}},
-        "model_info": {"status": "running", "details": {}},
-        "predictions": {"status": "running", "details": {}},
-        "error_handling": {"status": "running", "details": {}},
-        "performance": {"status": "running", "details": {}},
-        "metrics": {"status": "running", "details": {}}
-    }
+    def __init__(self, sample_size=20):
+        self.sample_size = sample_size
+        self.total_metrics = 0
+        self.sample_metrics = []
     
-    # Health test
+    def add(self, line):
+        if len(self.sample_metrics) < self.sample_size:
+            self.sample_metrics.append(line)
+        if line and not line.startswith('#'):
+            self.total_metrics += 1
+
+def _request_metrics(path, timeout=10):
+    """Stream a metrics exposition from the API; return (status, _MetricsSummary or None)"""
+    with SESSION.get(f"{API_BASE_URL}{path}", timeout=(CONNECT_TIMEOUT_S, timeout), stream=True) as response:
+        if response.status_code != 200:
+            return response.status_code, None
+        summary = _MetricsSummary()
+        for line in response.iter_lines():
+            summary.add(line.decode('utf-8'))
+        return response.status_code, summary
+
+def _outcome(call, *args, **kwargs):
+    """Run a request, returning any raised exception as the outcome"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            test_results["health"] = {
-                "status": "passed",
-                "details": data
-            }
-        else:
-            test_results["health"] = {
-                "status": "failed",
-                "details": {"error": f"Status code: {response.status_code}"}
-            }
+        return call(*args, **kwargs)
     except Exception as e:
-        test_results["health"] = {
-            "status": "failed",
-            "details": {"error": str(e)}
-        }
-    
-    # Model info test
-    try:
-        response = requests.get(f"{API_BASE_URL}/model/info", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            test_results["model_info"] = {
-                "status": "passed",
-                "details": data
-            }
-        else:
-            test_results["model_info"] = {
-                "status": "failed",
-                "details": {"error": f"Status code: {response.status_code}"}
-            }
-    except Exception as e:
-        test_results["model_info"] = {
-            "status": "failed",
-            "details": {"error": str(e)}
-        }
-    
-    # Prediction tests
-    correct_predictions = 0
-    prediction_details = []
-    
-    for sample in SAMPLE_PREDICTIONS:
+        return e
+
+def _timed_outcome(call, *args, **kwargs):
+    """Run a request, returning (outcome, its own duration in monotonic nanoseconds)"""
+    start_ns = time.perf_counter_ns()
+    outcome = _outcome(call, *args, **kwargs)
+    return outcome, time.perf_counter_ns() - start_ns
+
+if AIOHTTP_AVAILABLE:
+    async def _request_async(session, method, path, timeout=10, body=None):
+        """Send one request to the API with an optional pre-encoded JSON body; return (status, decoded JSON body or None)"""
+        async with session.request(method, f"{API_BASE_URL}{path}", data=body,
+                                   headers=_JSON_HEADERS if body is not None else None,
+                                   timeout=aiohttp.ClientTimeout(total=timeout, sock_connect=CONNECT_TIMEOUT_S)) as response:
+            try:
+                return response.status, await response.json(content_type=None)
+            except ValueError:
+                return response.status, None
+
+    async def _request_metrics_async(session, path, timeout=10):
+        """Stream a metrics exposition from the API; return (status, _MetricsSummary or None)"""
+        async with session.get(f"{API_BASE_URL}{path}", timeout=aiohttp.ClientTimeout(total=timeout, sock_connect=CONNECT_TIMEOUT_S)) as response:
+            if response.status != 200:
+                return response.status, None
+            summary = _MetricsSummary()
+            async for line in response.content:
+                summary.add(line.decode('utf-8').rstrip('\r\n'))
+            return response.status, summary
+
+    async def _outcome_async(request):
+        """Await a request, returning any raised exception as the outcome"""
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/predict",
-                json={"features": sample["features"]},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                predicted_class = data["prediction"]["class_name"]
-                confidence = data["prediction"]["confidence"]
-                is_correct = predicted_class == sample["expected"]
-                
-                if is_correct:
-                    correct_predictions += 1
-                
-                prediction_details.append({
-                    "description": sample["description"],
-                    "features": sample["features"],
-                    "expected": sample["expected"],
-                    "predicted": predicted_class,
-                    "confidence": confidence,
-                    "correct": is_correct,
-                    "probabilities": data["probabilities"]
-                })
-            else:
-                prediction_details.append({
-                    "description": sample["description"],
-                    "features": sample["features"],
-                    "expected": sample["expected"],
-                    "error": f"Status code: {response.status_code}"
-                })
-                
+            return await request
         except Exception as e:
-            prediction_details.append({
-                "description": sample["description"],
-                "features": sample["features"],
-                "expected": sample["expected"],
-                "error": str(e)
-            })
+            return e
+
+    async def _timed_outcome_async(request):
+        """Await a request, returning (outcome, its own duration in monotonic nanoseconds)"""
+        start_ns = time.perf_counter_ns()
+        outcome = await _outcome_async(request)
+        return outcome, time.perf_counter_ns() - start_ns
+
+def _endpoint_section(outcome):
+    """Test result for an endpoint that should answer 200 with JSON"""
+    if isinstance(outcome, Exception):
+        return SubTest("failed", {"error": str(outcome)})
     
+    status, data = outcome
+    if status == 200:
+        return SubTest("passed", data)
+    return SubTest("failed", {"error": f"Status code: {status}"})
+
+def _prediction_detail(sample, prediction=None, probabilities=None, error=None):
+    """Describe the prediction made for one sample, or why it failed"""
+    detail = {
+        "description": sample["description"],
+        "features": sample["features"],
+        "expected": sample["expected"]
+    }
+    if error is not None:
+        detail["error"] = error
+    else:
+        detail.update({
+            "predicted": prediction["class_name"],
+            "confidence": prediction["confidence"],
+            "correct": prediction["class_name"] == sample["expected"],
+            "probabilities": probabilities
+        })
+    return detail
+
+def _sample_prediction_detail(sample, outcome):
+    """Describe a single-sample /predict outcome"""
+    if isinstance(outcome, Exception):
+        return _prediction_detail(sample, error=str(outcome))
+    
+    status, data = outcome
+    if status != 200:
+        return _prediction_detail(sample, error=f"Status code: {status}")
+    try:
+        return _prediction_detail(sample, data["prediction"], data["probabilities"])
+    except (KeyError, TypeError) as e:
+        return _prediction_detail(sample, error=f"Malformed response: {e}")
+
+def _batch_prediction_details(samples, outcome):
+    """Describe a /predict_batch outcome per sample; None if the batch endpoint is unusable"""
+    if isinstance(outcome, Exception) or outcome[0] == 404:
+        return None
+    
+    status, data = outcome
+    if status != 200:
+        return [_prediction_detail(sample, error=f"Status code: {status}") for sample in samples]
+    try:
+        return [
+            _prediction_detail(sample, prediction, prediction["probabilities"])
+            for sample, prediction in zip(samples, data["predictions"])
+        ]
+    except (KeyError, TypeError):
+        return None
+
+def _predictions_section(prediction_details):
+    """Test result for the sample predictions"""
+    correct_predictions = sum(1 for detail in prediction_details if detail.get("correct"))
     accuracy = correct_predictions / len(SAMPLE_PREDICTIONS)
-    test_results["predictions"] = {
-        "status": "passed" if accuracy > 0.8 else "failed",
-        "details": {
+    return SubTest(
+        "passed" if accuracy > 0.8 else "failed",
+        {
             "accuracy": accuracy,
             "correct": correct_predictions,
             "total": len(SAMPLE_PREDICTIONS),
             "predictions": prediction_details
         }
+    )
+
+def _error_case_result(case, outcome):
+    """Check one invalid request was rejected with a 400"""
+    if isinstance(outcome, Exception):
+        return {"name": case["name"], "error": str(outcome), "passed": False}
+    
+    status, data = outcome
+    return {
+        "name": case["name"],
+        "expected_status": 400,
+        "actual_status": status,
+        "passed": status == 400,
+        "error_message": (data or {}).get("error", "No error message") if status == 400 else None
     }
+
+def _error_handling_section(error_results):
+    """Test result for the invalid-request cases"""
+    error_passed = all(result.get("passed", False) for result in error_results)
+    return SubTest(
+        "passed" if error_passed else "failed",
+        {"tests": error_results}
+    )
+
+def _performance_section(timed_outcomes, total_ns):
+    """Test result for the timed burst of predictions, from (outcome, duration_ns) pairs and the burst's wall time"""
+    total_requests = len(timed_outcomes)
+    successful_requests = sum(
+        1 for outcome, _ in timed_outcomes if not isinstance(outcome, Exception) and outcome[0] == 200
+    )
+    durations_ms = [duration_ns / 1e6 for _, duration_ns in timed_outcomes]
+    return SubTest(
+        "passed" if successful_requests >= (total_requests * 0.9) else "failed",
+        {
+            "total_time": total_ns / 1e9,
+            "successful_requests": successful_requests,
+            "total_requests": total_requests,
+            "avg_response_time": statistics.fmean(durations_ms),
+            "p50_response_time": statistics.median(durations_ms),
+            "p95_response_time": statistics.quantiles(durations_ms, n=20)[18] if total_requests > 1 else durations_ms[0],
+            "requests_per_second": total_requests * 1e9 / total_ns
+        }
+    )
+
+def _metrics_section(outcome):
+    """Test result for the Prometheus metrics endpoint"""
+    if isinstance(outcome, Exception):
+        return SubTest(
+            "info",
+            {"message": f"Metrics not accessible: {str(outcome)}"}
+        )
     
-    # Error handling tests
-    error_cases = [
-        {"name": "Missing features", "data": {"wrong_field": [1, 2, 3, 4]}},
-        {"name": "Wrong feature count", "data": {"features": [1, 2, 3]}},
-        {"name": "Non-numeric features", "data": {"features": ["a", "b", "c", "d"]}},
-        {"name": "Empty features", "data": {"features": []}},
-    ]
+    status, summary = outcome
+    if status != 200:
+        return SubTest(
+            "info",
+            {"message": "Metrics endpoint not available (Prometheus may not be installed)"}
+        )
     
-    error_results = []
-    for case in error_cases:
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/predict",
-                json=case["data"],
-                timeout=10
-            )
-            
-            error_results.append({
-                "name": case["name"],
-                "expected_status": 400,
-                "actual_status": response.status_code,
-                "passed": response.status_code == 400,
-                "error_message": response.json().get("error", "No error message") if response.status_code == 400 else None
-            })
-        except Exception as e:
-            error_results.append({
-                "name": case["name"],
-                "error": str(e),
-                "passed": False
-            })
-    
-    error_passed = all(result.get("passed", False) for result in error_results)
-    test_results["error_handling"] = {
-        "status": "passed" if error_passed else "failed",
-        "details": {"tests": error_results}
-    }
+    return SubTest(
+        "passed",
+        {
+            "total_metrics": summary.total_metrics,
+            "sample_metrics": summary.sample_metrics
+        }
+    )
+
+def _run_tests_sync():
+    """Run the test suite with blocking requests, fanning out independent calls on threads"""
+    _record_result("health", _endpoint_section(_outcome(_request, 'GET', '/health')))
+    _record_result("model_info", _endpoint_section(_outcome(_request, 'GET', '/model/info')))
     
-    # Performance test
-    start_time = time.time()
-    successful_requests = 0
-    total_requests = 20  # Reduced for web interface
+    # Prediction tests in one batch round-trip
+    prediction_details = _batch_prediction_details(
+        SAMPLE_PREDICTIONS, _outcome(_request, 'POST', '/predict_batch', body=_BATCH_BODY)
+    )
     
-    for _ in range(total_requests):
-        sample = SAMPLE_PREDICTIONS[0]  # Use first sample for consistency
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/predict",
-                json={"features": sample["features"]},
-                timeout=5
+    with ThreadPoolExecutor(max_workers=TEST_CONCURRENCY) as executor:
+        # Older APIs without /predict_batch: one request per sample
+        if prediction_details is None:
+            outcomes = executor.map(
+                lambda body: _outcome(_request, 'POST', '/predict', body=body), _SAMPLE_BODIES
             )
-            if response.status_code == 200:
-                successful_requests += 1
-        except:
-            pass
+            prediction_details = [
+                _sample_prediction_detail(sample, outcome) for sample, outcome in zip(SAMPLE_PREDICTIONS, outcomes)
+            ]
+        _record_result("predictions", _predictions_section(prediction_details))
+        
+        outcomes = executor.map(lambda body: _outcome(_request, 'POST', '/predict', body=body), _ERROR_BODIES)
+        _record_result("error_handling", _error_handling_section([
+            _error_case_result(case, outcome) for case, outcome in zip(ERROR_CASES, outcomes)
+        ]))
+        
+        # Performance test; use first sample for consistency
+        start_ns = time.perf_counter_ns()
+        timed_outcomes = list(executor.map(
+            lambda _: _timed_outcome(_request, 'POST', '/predict', timeout=5, body=_SAMPLE_BODIES[0]),
+            range(PERFORMANCE_REQUESTS)
+        ))
+        _record_result("performance", _performance_section(timed_outcomes, time.perf_counter_ns() - start_ns))
     
-    end_time = time.time()
-    total_time = end_time - start_time
+    _record_result("metrics", _metrics_section(_outcome(_request_metrics, '/metrics')))
+
+async def _run_tests_async():
+    """Run the test suite on one aiohttp session, with independent checks in flight together"""
+    connector = aiohttp.TCPConnector(limit=50, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        
+        async def endpoint(key, path):
+            _record_result(key, _endpoint_section(await _outcome_async(_request_async(session, 'GET', path))))
+        
+        async def predictions():
+            prediction_details = _batch_prediction_details(SAMPLE_PREDICTIONS, await _outcome_async(
+                _request_async(session, 'POST', '/predict_batch', body=_BATCH_BODY)
+            ))
+            # Older APIs without /predict_batch: one request per sample
+            if prediction_details is None:
+                outcomes = await asyncio.gather(*[
+                    _outcome_async(_request_async(session, 'POST', '/predict', body=body))
+                    for body in _SAMPLE_BODIES
+                ])
+                prediction_details = [
+                    _sample_prediction_detail(sample, outcome) for sample, outcome in zip(SAMPLE_PREDICTIONS, outcomes)
+                ]
+            _record_result("predictions", _predictions_section(prediction_details))
+        
+        async def error_handling():
+            outcomes = await asyncio.gather(*[
+                _outcome_async(_request_async(session, 'POST', '/predict', body=body))
+                for body in _ERROR_BODIES
+            ])
+            _record_result("error_handling", _error_handling_section([
+                _error_case_result(case, outcome) for case, outcome in zip(ERROR_CASES, outcomes)
+            ]))
+        
+        async def metrics():
+            _record_result("metrics", _metrics_section(
+                await _outcome_async(_request_metrics_async(session, '/metrics'))
+            ))
+        
+        await asyncio.gather(
+            endpoint("health", "/health"),
+            endpoint("model_info", "/model/info"),
+            predictions(),
+            error_handling(),
+            metrics()
+        )
+        
+        # Performance test runs alone so the other checks do not skew its timing; use first sample
+        start_ns = time.perf_counter_ns()
+        timed_outcomes = await asyncio.gather(*[
+            _timed_outcome_async(_request_async(session, 'POST', '/predict', timeout=5, body=_SAMPLE_BODIES[0]))
+            for _ in range(PERFORMANCE_REQUESTS)
+        ])
+        _record_result("performance", _performance_section(timed_outcomes, time.perf_counter_ns() - start_ns))
+
+def _record_result(section, result):
+    """Store one section's test result and mark the rendered dashboard stale"""
+    global _results_version
+    setattr(test_results, section, result)
+    _results_version += 1
+
+def run_comprehensive_tests():
+    """Run comprehensive tests and store results"""
+    global test_results, _results_version
     
-    test_results["performance"] = {
-        "status": "passed" if successful_requests >= (total_requests * 0.9) else "failed",
-        "details": {
-            "total_time": total_time,
-            "successful_requests": successful_requests,
-            "total_requests": total_requests,
-            "avg_response_time": (total_time / total_requests) * 1000,
-            "requests_per_second": total_requests / total_time
-        }
-    }
+    test_results = TestSuite()
+    _results_version += 1
     
-    # Metrics test
-    try:
-        response = requests.get(f"{API_BASE_URL}/metrics", timeout=10)
-        if response.status_code == 200:
-            metrics_text = response.text
-            metric_lines = [line for line in metrics_text.split('\n') if line and not line.startswith('#')]
-            sample_metrics = metrics_text.split('\n')[:20]
-            
-            test_results["metrics"] = {
-                "status": "passed",
-                "details": {
-                    "total_metrics": len(metric_lines),
-                    "sample_metrics": sample_metrics
-                }
-            }
-        else:
-            test_results["metrics"] = {
-                "status": "info",
-                "details": {"message": "Metrics endpoint not available (Prometheus may not be installed)"}
-            }
-    except Exception as e:
-        test_results["metrics"] = {
-            "status": "info",
-            "details": {"message": f"Metrics not accessible: {str(e)}"}
-        }
+    if AIOHTTP_AVAILABLE:
+        asyncio.run(_run_tests_async())
+    else:
+        _run_tests_sync()
 
 @web_app.route('/')
 def dashboard():
-    """Main dashboard page"""
+    """Main dashboard page, re-rendered only when the health status or test results change"""
+    global _dashboard_cache
     check_api_health()
-    return render_template('dashboard.html', 
-                         api_status=api_status, 
-                         test_results=test_results,
-                         sample_predictions=SAMPLE_PREDICTIONS,
-                         datetime=datetime)
+    
+    key = (_health_checked_at, _results_version)
+    cached_key, html = _dashboard_cache
+    if cached_key != key:
+        html = render_template('dashboard.html', 
+                             api_status=api_status, 
+                             test_results=test_results,
+                             sample_predictions=SAMPLE_PREDICTIONS,
+                             rendered_at=_RENDERED_AT_MARKER)
+        _dashboard_cache = (key, html)
+    return html.replace(_RENDERED_AT_MARKER, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 1)
+
+def _run_tests_in_background():
+    """Run the test suite, then allow the next run to start"""
+    try:
+        run_comprehensive_tests()
+    finally:
+        _tests_running.clear()
 
 @web_app.route('/run_tests')
 def run_tests():
-    """Run comprehensive tests"""
-    # Run tests in background thread
-    thread = threading.Thread(target=run_comprehensive_tests)
-    thread.daemon = True
-    thread.start()
+    """Run comprehensive tests, unless a run is already in progress"""
+    with _tests_lock:
+        if not _tests_running.is_set():
+            _tests_running.set()
+            
+            # Run tests in background thread
+            thread = threading.Thread(target=_run_tests_in_background)
+            thread.daemon = True
+            thread.start()
     
     return redirect(url_for('dashboard'))
 
@@ -293,9 +588,18 @@ def run_tests():
 def api_predict():
     """Proxy endpoint for predictions with CORS support"""
     try:
-        data = request.get_json()
-        response = requests.post(f"{API_BASE_URL}/predict", json=data, timeout=10)
-        return jsonify(response.json()), response.status_code
+        # Relay the JSON bodies as raw bytes; the API validates and encodes them itself
+        response = SESSION.post(
+            f"{API_BASE_URL}/predict",
+            data=request.get_data(),
+            headers={'Content-Type': 'application/json'},
+            timeout=(CONNECT_TIMEOUT_S, 10)
+        )
+        return Response(
+            response.content,
+            status=response.status_code,
+            content_type=response.headers.get('Content-Type', 'application/json')
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -308,7 +612,7 @@ def api_health():
 @web_app.route('/api/test_results')
 def get_test_results():
     """Get current test results"""
-    return jsonify(test_results)
+    return jsonify(test_results.to_dict() if test_results else {})
 
 if __name__ == '__main__':
     # Create templates directory if it doesn't exist
@@ -319,4 +623,11 @@ if __name__ == '__main__':
     print("API Endpoint:", API_BASE_URL)
     print("Web Interface will be available at: http://localhost:8080")
     
-    web_app.run(host='0.0.0.0', port=8080, debug=True)
\ No newline at end of file
+    debug = os.environ.get('DEBUG', 'False').lower() == 'true'
+    
+    # Serve from one multi-threaded process: test results and health status live in this
+    # process's memory, so they must not be split across worker processes
+    if WAITRESS_AVAILABLE and not debug:
+        serve(web_app, host='0.0.0.0', port=8080, threads=8, channel_timeout=15)
+    else:
+        web_app.run(host='0.0.0.0', port=8080, debug=debug, threaded=True)
\ No newline at end of file